@@ -0,0 +1,95 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory
+
+from api.v1.caching import get_cache
+from api.v1.pagination import CachedCountPagination
+from api.v1.views import (
+    CategoryViewSet,
+    CommentViewSet,
+    GenresViewSet,
+    ReviewsViewSet,
+    TitleViewSet
+)
+from reviews.models import Review, Title
+
+BENCHMARK_CACHE = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = ('Compare list response times of the serializer path and the '
+            'values() fast path on the current database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--page-size', type=int, default=100)
+
+    def get_endpoints(self):
+        endpoints = [
+            ('categories', CategoryViewSet, {}),
+            ('genres', GenresViewSet, {}),
+            ('titles', TitleViewSet, {}),
+        ]
+        title = Title.objects.annotate(
+            total=Count('reviews')
+        ).order_by('-total').first()
+        if title is not None:
+            endpoints.append(
+                ('reviews', ReviewsViewSet, {'title_id': title.pk})
+            )
+        review = Review.objects.annotate(
+            total=Count('comments')
+        ).order_by('-total').first()
+        if review is not None:
+            endpoints.append(('comments', CommentViewSet, {
+                'title_id': review.title_id, 'review_id': review.pk
+            }))
+        return endpoints
+
+    def measure(self, view, kwargs, repeat):
+        request = APIRequestFactory().get('/')
+        started = time.perf_counter()
+        for _ in range(repeat):
+            get_cache().clear()
+            response = view(request, **kwargs)
+            response.render()
+        elapsed = (time.perf_counter() - started) / repeat * 1000
+        return elapsed, response.content
+
+    def handle(self, *args, **options):
+        pagination_class = type('BenchmarkPagination', (
+            CachedCountPagination,
+        ), {'page_size': options['page_size']})
+        # Отдельный кэш, который очищается перед каждым запросом: иначе
+        # измерялось бы чтение готового ответа из кэша.
+        caches = dict(settings.CACHES, **{BENCHMARK_CACHE: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': BENCHMARK_CACHE,
+        }})
+        with override_settings(CACHES=caches,
+                               API_CACHE_ALIAS=BENCHMARK_CACHE):
+            for name, viewset, kwargs in self.get_endpoints():
+                timings = {}
+                for fast_list in (False, True):
+                    view = viewset.as_view(
+                        {'get': 'list'},
+                        pagination_class=pagination_class,
+                        fast_list=fast_list,
+                    )
+                    timings[fast_list] = self.measure(
+                        view, kwargs, options['repeat']
+                    )
+                (slow, expected), (fast, content) = (timings[False],
+                                                     timings[True])
+                if content != expected:
+                    raise CommandError(
+                        f'{name}: fast path response differs'
+                    )
+                self.stdout.write(
+                    f'{name}: serializers {slow:.2f} ms, '
+                    f'values() {fast:.2f} ms, x{slow / fast:.2f}'
+                )
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from api.v1 import availability, caching
+        caching.connect_signals()
+        availability.connect_signals()
@@ -0,0 +1,119 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from api.v1.caching import get_versions, is_shared_cache
+from users.models import User
+
+VERSION_CLAIM = 'ver'
+CLAIMS = ('username', 'role', 'is_superuser', VERSION_CLAIM)
+
+
+def get_user_version(user_id):
+    """Метка версии пользователя: меняется при каждом сохранении и удалении."""
+    return get_versions([(User, f'id={user_id}')])[0]
+
+
+class ClaimsAccessToken(AccessToken):
+    """AccessToken с ролью пользователя и меткой его версии."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        token['role'] = user.role
+        token['is_superuser'] = user.is_superuser
+        token[VERSION_CLAIM] = get_user_version(user.pk)
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, собранный из утверждений токена, без запроса к БД."""
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN
+
+    @property
+    def is_user(self):
+        return self.role == User.USER
+
+
+def get_user_instance(user):
+    """Экземпляр модели User для пользователя из запроса."""
+    if isinstance(user, ClaimsUser):
+        return User.objects.get(pk=user.pk)
+    return user
+
+
+@lru_cache(maxsize=settings.JWT_TOKEN_CACHE_SIZE)
+def decode_token(raw_token):
+    """Проверенный токен; подпись проверяется один раз на токен."""
+    return JWTAuthentication().get_validated_token(raw_token)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без запроса пользователя для чтения.
+
+    Для безопасных методов пользователь собирается из утверждений токена,
+    выданного `get_jwt_token`, если метка версии в токене совпадает с
+    текущей: изменение или удаление пользователя сдвигает метку, и такой
+    токен снова проверяется по БД. Токены без утверждений (выданные
+    AccessToken.for_user) и запросы на запись всегда идут в БД.
+
+    Метки версий живут в кэше API, поэтому путь без БД включается только
+    с общим кэшем: в памяти процесса воркер не увидит сдвиг метки,
+    сделанный другим воркером, и примет токен с отозванной ролью.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if request.method in SAFE_METHODS and is_shared_cache():
+            user = self.get_claims_user(validated_token)
+            if user is not None:
+                return user, validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_validated_token(self, raw_token):
+        token = decode_token(raw_token)
+        try:
+            # Токен из кэша мог истечь после первой проверки.
+            token.check_exp(current_time=aware_utcnow())
+        except TokenError as error:
+            raise InvalidToken({
+                'detail': error.args[0],
+                'messages': [],
+            })
+        return token
+
+    def get_claims_user(self, token):
+        if not all(claim in token for claim in CLAIMS):
+            return None
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        if (user_id is None
+                or token[VERSION_CLAIM] != get_user_version(user_id)):
+            return None
+        return ClaimsUser(token)
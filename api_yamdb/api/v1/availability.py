@@ -0,0 +1,149 @@
+import hashlib
+import math
+import threading
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+from api.v1.caching import bump_scopes, get_versions
+from users.models import User
+
+# Поля, свободу значений которых можно проверить.
+FIELDS = ('username', 'email')
+# Область версии пользователей, которая сдвигается только при смене имени
+# или адреса и при удалении: тогда фильтр перестраивается целиком.
+IDENTITY_SCOPE = 'identity'
+
+
+class BloomFilter:
+    """
+    Фильтр Блума: `value in bloom` бывает ложноположительным с
+    вероятностью не выше error_rate, но никогда — ложноотрицательным.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(
+            -self.capacity * math.log(error_rate) / math.log(2) ** 2
+        ))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, value):
+        # Двойное хеширование: k позиций из двух половин одного дайджеста.
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + number * second) % self.size
+                for number in range(self.hashes))
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self.positions(value))
+
+
+def filter_key(field, value):
+    return f'{field}:{value}'
+
+
+class AvailabilityIndex:
+    """
+    Фильтр Блума по именам и адресам всех пользователей, один на процесс.
+
+    Строится лениво при первой проверке и пополняется сигналом post_save
+    пользователя. Изменения из других процессов видны по меткам версий
+    в кэше API: после сдвига общей метки пользователей (регистрация)
+    дочитываются записи с id больше последнего известного, а после сдвига
+    метки IDENTITY_SCOPE (смена имени или адреса, удаление) фильтр
+    перестраивается целиком, иначе занятое новое имя считалось бы
+    свободным.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.max_pk = 0
+        self.versions = None
+
+    def reset(self):
+        with self.lock:
+            self.bloom = None
+
+    def get_versions(self):
+        return get_versions([User, (User, IDENTITY_SCOPE)])
+
+    def add_user(self, user):
+        with self.lock:
+            if self.bloom is None:
+                return
+            self.add_values(user.pk, user.username, user.email)
+
+    def add_values(self, pk, username, email):
+        self.bloom.add(filter_key('username', username))
+        self.bloom.add(filter_key('email', email))
+        self.max_pk = max(self.max_pk, pk)
+
+    def build(self):
+        users = User.objects.values_list('pk', 'username', 'email')
+        capacity = 2 * len(FIELDS) * max(
+            users.count(), settings.USER_AVAILABILITY_MIN_CAPACITY
+        )
+        self.bloom = BloomFilter(capacity,
+                                 settings.USER_AVAILABILITY_ERROR_RATE)
+        self.max_pk = 0
+        for values in users.order_by().iterator():
+            self.add_values(*values)
+
+    def refresh(self):
+        # Метки читаются до чтения пользователей: запись, сделанная во
+        # время него, сдвинет метку ещё раз и будет учтена при следующей
+        # проверке.
+        versions = self.get_versions()
+        with self.lock:
+            if (self.bloom is None or self.versions is None
+                    or versions[1] != self.versions[1]
+                    or self.bloom.count > self.bloom.capacity):
+                self.build()
+            elif versions[0] != self.versions[0]:
+                for values in User.objects.filter(
+                    pk__gt=self.max_pk
+                ).values_list('pk', 'username', 'email'):
+                    self.add_values(*values)
+            self.versions = versions
+
+    def is_available(self, field, value):
+        """Свободно ли значение; в БД — только если фильтр не уверен."""
+        self.refresh()
+        if filter_key(field, value) not in self.bloom:
+            return True
+        return not User.objects.filter(**{field: value}).exists()
+
+
+availability_index = AvailabilityIndex()
+
+
+def _user_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    identity = (instance.username, instance.email)
+    if not created and getattr(instance, '_loaded_identity', None) != identity:
+        bump_scopes(User, [IDENTITY_SCOPE])
+    instance._loaded_identity = identity
+    availability_index.add_user(instance)
+
+
+def _user_deleted(sender, instance, **kwargs):
+    bump_scopes(User, [IDENTITY_SCOPE])
+
+
+def connect_signals():
+    post_save.connect(_user_saved, sender=User,
+                      dispatch_uid='api:v1:availability:user_saved')
+    post_delete.connect(_user_deleted, sender=User,
+                        dispatch_uid='api:v1:availability:user_deleted')
@@ -0,0 +1,241 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+VERSION_KEY_PREFIX = 'api:v1:version:'
+
+# Поля, по значениям которых у модели ведутся отдельные версии, например
+# версия отзывов одного произведения: `reviews.review:title_id=5`.
+VERSION_SCOPES = {
+    'reviews.title': ('id',),
+    'reviews.review': ('id', 'title_id'),
+    'reviews.comments': ('review_id',),
+    'users.user': ('id',),
+}
+
+
+def get_cache():
+    """Кэш API: локальный в памяти или общий для всех воркеров."""
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def is_shared_cache():
+    """Видят ли все воркеры одни и те же записи кэша API."""
+    return not isinstance(get_cache(), (LocMemCache, DummyCache))
+
+
+def version_key(model, scope=None):
+    key = f'{VERSION_KEY_PREFIX}{model._meta.label_lower}'
+    if scope is not None:
+        key = f'{key}:{scope}'
+    return key
+
+
+def get_versions(dependencies):
+    """
+    Возвращает метки версий — время последней записи в таблицу модели
+    или, для пары (модель, область), в её часть из VERSION_SCOPES.
+    Метка, вытесненная из кэша, заново выставляется текущим временем,
+    поэтому устаревшие записи кэша не оживают.
+    """
+    cache = get_cache()
+    keys = [
+        version_key(*dependency) if isinstance(dependency, tuple)
+        else version_key(dependency)
+        for dependency in dependencies
+    ]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_keys(keys):
+    """
+    Сдвигает метки версий как минимум на секунду вперёд: `Last-Modified`
+    — метка с точностью до секунды, и запись в ту же секунду, что и
+    предыдущая, иначе не изменила бы его, а `If-Modified-Since` получил
+    бы устаревший ответ 304.
+    """
+    cache = get_cache()
+    now = time.time()
+    previous = cache.get_many(keys)
+    cache.set_many({
+        key: max(now, math.floor(previous[key]) + 1) if key in previous
+        else now
+        for key in keys
+    }, None)
+
+
+def bump_version(model, instance=None):
+    keys = [version_key(model)]
+    if instance is not None:
+        keys.extend(
+            version_key(model, f'{field}={getattr(instance, field)}')
+            for field in VERSION_SCOPES.get(model._meta.label_lower, ())
+        )
+    bump_keys(keys)
+
+
+def bump_scopes(model, scopes):
+    """Сдвигает версии частей таблицы модели, не трогая версию таблицы."""
+    bump_keys([version_key(model, scope) for scope in scopes])
+
+
+def make_key(prefix, *parts):
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'api:v1:{prefix}:{digest}'
+
+
+def normalize_query(query_params, exclude=()):
+    """Параметры запроса в каноническом виде, независимо от порядка."""
+    return tuple(sorted(
+        (name, tuple(sorted(query_params.getlist(name))))
+        for name in query_params
+        if name not in exclude
+    ))
+
+
+class ResponseCacheMixin:
+    """
+    Кэширует ответы GET по пути, нормализованной строке запроса и классу
+    аутентификации. В ключ входят версии моделей `cache_dependencies`,
+    так что ответ становится недействительным при любой записи в них.
+    """
+    cache_dependencies = ()
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        authenticator = request.successful_authenticator
+        key = make_key(
+            'response',
+            request.path,
+            normalize_query(request.query_params),
+            type(authenticator).__name__ if authenticator else None,
+            get_versions(self.cache_dependencies),
+        )
+        cache = get_cache()
+        cached = cache.get(key)
+        if cached is not None:
+            return Response(cached)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class CachedListModelMixin(ResponseCacheMixin):
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedRetrieveModelMixin(ResponseCacheMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """
+    Условные GET-запросы (If-None-Match / If-Modified-Since).
+
+    ETag и Last-Modified строятся по меткам версий зависимостей, поэтому
+    для ответа 304 не нужны ни запросы к БД, ни сериализация.
+    """
+
+    def get_validator_dependencies(self):
+        return self.cache_dependencies
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.get_validator_dependencies())
+        etag = quote_etag(make_key(
+            'etag',
+            request.path,
+            normalize_query(request.query_params),
+            request.accepted_renderer.format,
+            versions,
+        ).rsplit(':', 1)[1])
+        last_modified = int(max(versions))
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ConditionalListModelMixin(ConditionalGetMixin):
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class ConditionalRetrieveModelMixin(ConditionalGetMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+def _model_changed(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    bump_version(sender, instance)
+
+
+def _user_changed(sender, instance, created=False, **kwargs):
+    """
+    Имя автора выводится в отзывах и комментариях, поэтому изменение
+    пользователя сдвигает версии отзывов произведений, к которым он писал
+    отзывы, и комментариев отзывов, которые он комментировал. У нового
+    пользователя ни того, ни другого ещё нет.
+    """
+    from reviews.models import Comments, Review
+    if kwargs.get('raw') or created:
+        return
+    title_ids = Review.objects.filter(author=instance).order_by().values_list(
+        'title_id', flat=True
+    ).distinct()
+    bump_scopes(Review, [f'title_id={title_id}' for title_id in title_ids])
+    review_ids = Comments.objects.filter(
+        author=instance
+    ).order_by().values_list('review_id', flat=True).distinct()
+    bump_scopes(Comments,
+                [f'review_id={review_id}' for review_id in review_ids])
+
+
+def _relation_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_version(sender)
+
+
+def connect_signals():
+    from reviews.models import Category, Comments, Genre, Review, Title
+    from users.models import User
+
+    for model in (Category, Comments, Genre, Review, Title, User):
+        post_save.connect(_model_changed, sender=model,
+                          dispatch_uid=f'{version_key(model)}:save')
+        post_delete.connect(_model_changed, sender=model,
+                            dispatch_uid=f'{version_key(model)}:delete')
+    post_save.connect(_user_changed, sender=User,
+                      dispatch_uid=f'{version_key(User)}:authors')
+    m2m_changed.connect(_relation_changed, sender=Title.genre.through,
+                        dispatch_uid=f'{version_key(Title.genre.through)}')
@@ -0,0 +1,53 @@
+from django.conf import settings
+
+from api.v1.fastpath import RowPlan
+from api.v1.renderers import StreamingJSONRenderer
+from api.v1.serializers import (
+    CommentExportSerializer,
+    ReviewExportSerializer,
+    TitleExportSerializer
+)
+from reviews.models import Comments, Review, Title
+
+# Ресурс выгрузки: модель, сериализатор и тип записи в NDJSON.
+EXPORT_RESOURCES = {
+    'titles': (Title, TitleExportSerializer, 'title'),
+    'reviews': (Review, ReviewExportSerializer, 'review'),
+    'comments': (Comments, CommentExportSerializer, 'comment'),
+}
+
+
+def iter_rows(queryset, keys, chunk_size):
+    """
+    Обходит queryset пачками по первичному ключу (keyset), поэтому память
+    не растёт с размером таблицы, а каждая пачка — один короткий запрос
+    без OFFSET.
+    """
+    queryset = queryset.order_by('pk').values(*keys)
+    last_pk = None
+    while True:
+        chunk = queryset
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        rows = list(chunk[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1]['id']
+
+
+def iter_export(resources, updated_since=None, chunk_size=None):
+    """Строки NDJSON вида {"type": "title", "data": {...}}."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    renderer = StreamingJSONRenderer()
+    for resource in resources:
+        model, serializer_class, kind = EXPORT_RESOURCES[resource]
+        plan = RowPlan(serializer_class(), model)
+        queryset = model.objects.all()
+        if updated_since is not None:
+            queryset = queryset.filter(updated_at__gte=updated_since)
+        for rows in iter_rows(queryset, plan.keys, chunk_size):
+            yield b''.join(
+                renderer.encode({'type': kind, 'data': data}) + b'\n'
+                for data in plan.render(rows)
+            )
@@ -0,0 +1,178 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+class UnsupportedField(Exception):
+    """Поле, которое нельзя вывести из строки values()."""
+
+
+class RowPlan:
+    """
+    Заранее разобранное отображение полей сериализатора на ключи values().
+
+    Для каждого выводимого поля хранится ключ строки и метод
+    `to_representation` того же поля сериализатора, поэтому значения
+    форматируются точно так же, как в обычном пути, но без создания
+    сериализаторов и обхода атрибутов модели для каждой строки.
+    """
+
+    def __init__(self, serializer, model, annotations=(), prefix=''):
+        self.model = model
+        self.prefix = prefix
+        self.pk_key = f'{prefix}{model._meta.pk.attname}'
+        self.entries = []
+        self.many = []
+        for name, field in serializer.fields.items():
+            self.entries.append(
+                (name,) + self.compile(field, model, annotations, prefix)
+            )
+
+    def compile(self, field, model, annotations, prefix):
+        source = field.source
+        if source == '*' or '.' in source:
+            raise UnsupportedField(source)
+        if isinstance(field, serializers.ListSerializer):
+            return self.compile_many(field, model, prefix)
+        if isinstance(field, (serializers.Serializer,
+                              serializers.PrimaryKeyRelatedField)):
+            return self.compile_foreign_key(field, model, prefix)
+        if isinstance(field, serializers.SlugRelatedField):
+            self.get_model_field(model, source)
+            # to_representation возвращает атрибут связанного объекта как есть.
+            return 'value', f'{prefix}{source}__{field.slug_field}', None
+        if isinstance(field, (serializers.RelatedField,
+                              serializers.ManyRelatedField,
+                              serializers.SerializerMethodField,
+                              serializers.ListField,
+                              serializers.DictField)):
+            raise UnsupportedField(source)
+        if not prefix and source in annotations:
+            return 'value', source, field.to_representation
+        model_field = self.get_model_field(model, source)
+        if model_field.is_relation or not model_field.concrete:
+            raise UnsupportedField(source)
+        key = f'{prefix}{model_field.attname}'
+        return 'value', key, field.to_representation
+
+    def compile_foreign_key(self, field, model, prefix):
+        source = field.source
+        model_field = self.get_model_field(model, source)
+        if not model_field.many_to_one:
+            raise UnsupportedField(source)
+        key = f'{prefix}{model_field.attname}'
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return 'value', key, None
+        plan = RowPlan(field, model_field.related_model,
+                       prefix=f'{prefix}{source}__')
+        return 'nested', key, plan
+
+    def compile_many(self, field, model, prefix):
+        source = field.source
+        if prefix or not isinstance(field.child, serializers.Serializer):
+            raise UnsupportedField(source)
+        model_field = self.get_model_field(model, source)
+        if not model_field.many_to_many:
+            raise UnsupportedField(source)
+        plan = RowPlan(field.child, model_field.related_model)
+        self.many.append((source, model_field, plan))
+        return 'many', source, plan
+
+    @staticmethod
+    def get_model_field(model, source):
+        try:
+            return model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise UnsupportedField(source)
+
+    @property
+    def keys(self):
+        keys = [self.pk_key]
+        for kind, key, extra in (entry[1:] for entry in self.entries):
+            if kind == 'value':
+                keys.append(key)
+            elif kind == 'nested':
+                keys.append(key)
+                keys.extend(extra.keys)
+        return list(dict.fromkeys(keys))
+
+    def render_row(self, row, related):
+        data = {}
+        for name, kind, key, extra in self.entries:
+            if kind == 'value':
+                value = row[key]
+                data[name] = (value if value is None or extra is None
+                              else extra(value))
+            elif kind == 'nested':
+                data[name] = (None if row[key] is None
+                              else extra.render_row(row, {}))
+            else:
+                data[name] = related[key].get(row[self.pk_key], [])
+        return data
+
+    def load_many(self, rows):
+        """Связи many-to-many одним запросом на поле, как prefetch_related."""
+        ids = [row[self.pk_key] for row in rows]
+        related = {}
+        for source, model_field, plan in self.many:
+            query_name = model_field.related_query_name()
+            grouped = related[source] = {}
+            if not ids:
+                continue
+            values = model_field.related_model._default_manager.filter(**{
+                f'{query_name}__in': ids
+            }).values(query_name, *plan.keys)
+            for value in values:
+                grouped.setdefault(value[query_name], []).append(
+                    plan.render_row(value, {})
+                )
+        return related
+
+    def render(self, rows):
+        rows = list(rows)
+        related = self.load_many(rows)
+        return [self.render_row(row, related) for row in rows]
+
+
+class FastListModelMixin:
+    """
+    Быстрый путь для списков: строки читаются через values() и сразу
+    превращаются в словари по RowPlan, без экземпляров моделей и
+    сериализаторов на каждую запись. Ответ совпадает с обычным
+    байт в байт. Если у сериализатора есть поля, которые нельзя вывести
+    из values(), или включена курсорная пагинация, используется
+    обычный путь.
+    """
+    fast_list = True
+
+    def get_row_plan(self, queryset):
+        if not (self.fast_list and settings.FAST_LIST_SERIALIZATION):
+            return None
+        paginator = self.paginator
+        cursor_paginator = getattr(paginator, 'cursor_paginator', None)
+        if (cursor_paginator is not None and cursor_paginator
+                .cursor_query_param in self.request.query_params):
+            return None
+        try:
+            return RowPlan(self.get_serializer(), queryset.model,
+                           queryset.query.annotations)
+        except UnsupportedField:
+            return None
+
+    def list(self, request, *args, **kwargs):
+        # get_queryset вызывается один раз: у вложенных ресурсов он
+        # проверяет существование родителя отдельным запросом.
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = self.get_row_plan(queryset)
+        if plan is None:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+            return Response(self.get_serializer(queryset, many=True).data)
+        rows = queryset.prefetch_related(None).values(*plan.keys)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(rows))
@@ -0,0 +1,105 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.serializers import ListSerializer
+
+FIELDS_QUERY_PARAM = 'fields'
+OMIT_QUERY_PARAM = 'omit'
+
+
+def parse_field_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Оставляет в ответе только поля из `context['fields']` (если задан) и
+    убирает поля из `context['omit']`. Действует только на сериализатор
+    верхнего уровня: вложенные жанры и категории выводятся целиком.
+    """
+
+    def is_top_level(self):
+        parent = self.parent
+        return parent is None or (
+            isinstance(parent, ListSerializer) and parent.parent is None
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_top_level():
+            return fields
+        only = self.context.get('fields')
+        omit = self.context.get('omit', ())
+        for name in list(fields):
+            if (only is not None and name not in only) or name in omit:
+                del fields[name]
+        return fields
+
+
+class SparseFieldsetMixin:
+    """
+    Поддержка `?fields=id,name` и `?omit=description` в GET-запросах.
+
+    Выбранный набор полей передаётся в сериализатор и опускается в SQL:
+    столбцы невыводимых полей откладываются через defer(), а связи —
+    убираются из select_related/prefetch_related, поэтому большие
+    текстовые поля не читаются с диска, если их не запросили.
+    """
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def get_sparse_fieldset(self):
+        if self.action not in self.sparse_fieldset_actions:
+            return None, set()
+        params = self.request.query_params
+        only = params.get(FIELDS_QUERY_PARAM)
+        return (
+            parse_field_names(only) if only is not None else None,
+            parse_field_names(params.get(OMIT_QUERY_PARAM, ''))
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['omit'] = self.get_sparse_fieldset()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        only, omit = self.get_sparse_fieldset()
+        if only is None and not omit:
+            return queryset
+        fields = self.get_serializer_class()().fields
+        kept = {
+            field.source.split('.')[0] for name, field in fields.items()
+            if (only is None or name in only) and name not in omit
+        }
+        dropped = {field.source for field in fields.values()} - kept
+        return self.apply_sparse_fieldset(queryset, dropped)
+
+    def apply_sparse_fieldset(self, queryset, dropped):
+        opts = queryset.model._meta
+        deferred = []
+        relations = set()
+        for source in dropped:
+            try:
+                field = opts.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if field.primary_key:
+                continue
+            if field.is_relation:
+                relations.add(source)
+            elif field.concrete:
+                deferred.append(source)
+        if relations:
+            select_related = queryset.query.select_related
+            prefetch_related = queryset._prefetch_related_lookups
+            if isinstance(select_related, dict):
+                # select_related() без аргументов подтянул бы все связи.
+                names = [name for name in select_related
+                         if name not in relations]
+                queryset = queryset.select_related(None)
+                if names:
+                    queryset = queryset.select_related(*names)
+            queryset = queryset.prefetch_related(None).prefetch_related(*(
+                lookup for lookup in prefetch_related
+                if lookup not in relations
+            ))
+        return queryset.defer(*deferred) if deferred else queryset
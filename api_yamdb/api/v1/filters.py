@@ -1,22 +1,110 @@
+from django.db.models import Count
 from django_filters import rest_framework
+from rest_framework import filters
 
-from reviews.models import Title
+from reviews.models import Review, Title
+from reviews.search import search_titles
+
+
+class TitleSearchFilter(filters.BaseFilterBackend):
+    """
+    Полнотекстовый поиск `?search=` по названию и описанию произведения
+    через индекс FTS5; результаты сортируются по релевантности.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        return search_titles(queryset, text)
+
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """
+    Дополняет сортировку из `?ordering=` полями сортировки по умолчанию,
+    чтобы порядок был однозначным: страницы не теряют и не повторяют
+    записи с равными значениями, а курсор может по нему продолжать.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        used = {name.lstrip('-') for name in ordering}
+        return list(ordering) + [
+            name for name in self.get_default_ordering(view) or ()
+            if name.lstrip('-') not in used
+        ]
+
+
+class CharInFilter(rest_framework.BaseInFilter, rest_framework.CharFilter):
+    pass
 
 
 class TitleFilter(rest_framework.FilterSet):
+    GENRE_ANY = 'any'
+    GENRE_ALL = 'all'
+    GENRE_MODES = [
+        (GENRE_ANY, 'Any of the genres'),
+        (GENRE_ALL, 'All of the genres'),
+    ]
+
     name = rest_framework.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
-    genre = rest_framework.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+    genre = CharInFilter(method='filter_genre')
+    genre_mode = rest_framework.ChoiceFilter(
+        choices=GENRE_MODES,
+        method='filter_genre_mode'
     )
-    category = rest_framework.CharFilter(
+    category = CharInFilter(
         field_name='category__slug',
-        lookup_expr='icontains'
+        lookup_expr='in'
+    )
+    rating_min = rest_framework.NumberFilter(
+        field_name='rating',
+        lookup_expr='gte'
+    )
+    rating_max = rest_framework.NumberFilter(
+        field_name='rating',
+        lookup_expr='lte'
     )
 
     class Meta:
         model = Title
-        fields = '__all__'
+        # Служебные колонки (счётчики рейтинга, гистограмма, updated_at)
+        # не индексированы и не должны становиться фильтрами.
+        fields = ('name', 'year', 'genre', 'category')
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Точное совпадение слагов через таблицу связей. Для режима `all`
+        произведения отбираются одним запросом с GROUP BY/HAVING, а не
+        цепочкой JOIN на каждый жанр.
+        """
+        slugs = set(value)
+        links = Title.genre.through.objects.filter(genre__slug__in=slugs)
+        if self.form.cleaned_data.get('genre_mode') == self.GENRE_ALL:
+            links = links.values('title_id').annotate(
+                matched=Count('genre_id')
+            ).filter(matched=len(slugs))
+        return queryset.filter(id__in=links.values('title_id'))
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Режим учитывается в filter_genre.
+        return queryset
+
+
+class ReviewFilter(rest_framework.FilterSet):
+    score_min = rest_framework.NumberFilter(
+        field_name='score',
+        lookup_expr='gte'
+    )
+    score_max = rest_framework.NumberFilter(
+        field_name='score',
+        lookup_expr='lte'
+    )
+
+    class Meta:
+        model = Review
+        fields = ('score',)
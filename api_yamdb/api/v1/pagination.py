@@ -0,0 +1,396 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import (
+    EmptyPage,
+    Page,
+    PageNotAnInteger,
+    Paginator
+)
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.v1.caching import (
+    get_cache,
+    get_versions,
+    make_key,
+    normalize_query
+)
+
+
+class CachedCountPage(Page):
+    """Страница, о следующей странице которой знает выборка, а не `count`."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который берёт общее количество объектов из кэша.
+
+    Закэшированное значение идёт только в поле `count`: строки страницы
+    выбираются отдельно срезом `[offset:offset + size + 1]`, поэтому
+    устаревший `count` не обрезает и не прячет страницы.
+    """
+
+    def __init__(self, object_list, per_page, cache_key, timeout, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = timeout
+
+    @cached_property
+    def count(self):
+        cache = get_cache()
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = super().count
+            cache.set(self.cache_key, count, self.timeout)
+        return count
+
+    def page(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        offset = (number - 1) * self.per_page
+        rows = list(self.object_list[offset:offset + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        return CachedCountPage(rows[:self.per_page], number, self,
+                               has_next=len(rows) > self.per_page)
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с кэшированием `count`.
+
+    Количество кэшируется на COUNT_CACHE_TIMEOUT секунд по пути запроса и
+    нормализованному набору фильтров. В ключ входят версии моделей из
+    `view.count_dependencies` (по умолчанию — модель queryset), поэтому
+    любая запись в эти таблицы сразу делает закэшированное значение
+    недействительным. С параметром `count=false` количество не
+    считается вовсе, а о следующей странице говорит только ссылка `next`.
+    """
+    count_query_param = 'count'
+    # Параметры, которые меняют вид ответа, но не число записей.
+    ignored_query_params = ('page', 'count', 'cursor', 'ordering', 'fields',
+                            'omit', 'text_preview', 'histogram')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        if request.query_params.get(self.count_query_param) == 'false':
+            return self.paginate_without_count(queryset, request)
+        dependencies = (getattr(view, 'count_dependencies', None)
+                        or (queryset.model,))
+        self.count_cache_key = make_key(
+            'count',
+            request.path,
+            normalize_query(request.query_params, self.ignored_query_params),
+            get_versions(dependencies),
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        return CachedCountPaginator(
+            object_list, per_page,
+            cache_key=self.count_cache_key,
+            timeout=settings.COUNT_CACHE_TIMEOUT,
+        )
+
+    def paginate_without_count(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        offset = (self.page_number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        if not results and self.page_number > 1:
+            raise NotFound(self.invalid_page_message)
+        self.page = None
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.page is not None:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', None),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_next_link(self):
+        if self.page is not None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.page_query_param, self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.page is not None:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация.
+
+    Страница выбирается условием по значениям ключа сортировки последней
+    показанной записи, а не через OFFSET, поэтому время выдачи не растёт
+    с номером страницы. Последнее поле `ordering` должно быть уникальным.
+    Курсор непрозрачен для клиента: это base64 от JSON с позицией.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    page_size = api_settings.PAGE_SIZE
+    ordering = ('-pk',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor['reverse']
+        if cursor is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(cursor['position'], reverse)
+            )
+        ordering = self.ordering
+        if reverse:
+            ordering = [self.invert(name) for name in ordering]
+
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_ordering(self, queryset):
+        return self.ordering
+
+    @staticmethod
+    def invert(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def get_position_filter(self, position, reverse):
+        """
+        Условие «строго после позиции» в лексикографическом порядке
+        по всем полям сортировки: (a < x) OR (a = x AND b < y) ...
+        """
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, position):
+            field_name = name.lstrip('-')
+            descending = name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= Q(**equal, **{f'{field_name}__{lookup}': value})
+            equal[field_name] = value
+        return condition
+
+    def encode_cursor(self, instance, reverse):
+        position = [field.value_to_string(instance) for field in self.fields]
+        payload = json.dumps({'r': reverse, 'p': position})
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position = payload['p']
+            reverse = payload['r']
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)
+                or not all(isinstance(value, str) for value in position)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [self.to_python(field, value)
+                        for field, value in zip(self.fields, position)]
+        except (DjangoValidationError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return {'position': position, 'reverse': bool(reverse)}
+
+    @staticmethod
+    def to_python(field, value):
+        """Значение поля из курсора; поддельное отклоняется до запроса."""
+        value = field.to_python(value)
+        field.run_validators(value)
+        # Целое шире 64 бит не передаётся в БД: драйвер падает раньше,
+        # чем запрос сравнит его с колонкой.
+        if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+            raise ValueError(value)
+        return value
+
+
+class PageOrCursorPagination(BasePagination):
+    """
+    Постраничная пагинация по умолчанию; курсорная — если в запросе
+    передан параметр `cursor` (для первой страницы — пустой).
+    Клиенты, которые используют `?page=`, продолжают работать как раньше.
+    """
+    page_pagination_class = CachedCountPagination
+    cursor_pagination_class = KeysetPagination
+
+    def __init__(self):
+        self.page_paginator = self.page_pagination_class()
+        self.cursor_paginator = self.cursor_pagination_class()
+        self.paginator = self.page_paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor_query_param = self.cursor_paginator.cursor_query_param
+        if cursor_query_param in request.query_params:
+            self.paginator = self.cursor_paginator
+        else:
+            self.paginator = self.page_paginator
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_paginator.get_paginated_response_schema(schema)
+
+    def get_schema_fields(self, view):
+        return (self.page_paginator.get_schema_fields(view)
+                + self.cursor_paginator.get_schema_fields(view))
+
+    def get_results(self, data):
+        return data['results']
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    @property
+    def display_page_controls(self):
+        return self.paginator.display_page_controls
+
+
+class TitleCursorPagination(KeysetPagination):
+    # Индекс по year в SQLite неявно заканчивается rowid (= id),
+    # поэтому сортировка (-year, -id) идёт по нему без доп. сортировки.
+    ordering = ('-year', '-id')
+    unsupported_ordering_message = (
+        'Курсорная пагинация не поддерживает сортировку по `{name}`.'
+    )
+
+    def get_ordering(self, queryset):
+        """
+        Сортировка из `?ordering=` с `-id` для однозначности. Курсор
+        хранит значения полей модели, поэтому сортировка по релевантности
+        `?search=` и по полям, где бывает NULL (рейтинг произведения без
+        отзывов), с курсором отклоняется.
+        """
+        ordering = tuple(queryset.query.order_by)
+        if not ordering:
+            return self.ordering
+        if ordering[-1].lstrip('-') != 'id':
+            ordering += ('-id',)
+        for name in ordering:
+            try:
+                field = queryset.model._meta.get_field(name.lstrip('-'))
+            except FieldDoesNotExist:
+                field = None
+            if field is None or field.null:
+                raise ValidationError({self.cursor_query_param: [
+                    self.unsupported_ordering_message.format(
+                        name=name.lstrip('-')
+                    )
+                ]})
+        return ordering
+
+
+class TitlePagination(PageOrCursorPagination):
+    cursor_pagination_class = TitleCursorPagination
+
+
+class NewestFirstCursorPagination(KeysetPagination):
+    # Отзывы и комментарии: обратный проход по индексу (родитель, pub_date).
+    ordering = ('-pub_date', '-id')
+
+    def get_ordering(self, queryset):
+        # Сортировку из `?ordering=` StableOrderingFilter уже дополнил до
+        # однозначной, курсор идёт по ней же.
+        return tuple(queryset.query.order_by) or self.ordering
+
+
+class NewestFirstPagination(PageOrCursorPagination):
+    cursor_pagination_class = NewestFirstCursorPagination
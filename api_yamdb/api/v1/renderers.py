@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import renderers
+from rest_framework.compat import SHORT_SEPARATORS
+from rest_framework.response import Response
+
+
+class StreamingJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer, который умеет отдавать ответ частями.
+
+    Вывод совпадает с renderers.JSONRenderer байт в байт (кириллица без
+    \\u-экранирования, U+2028/U+2029 экранируются). Компактный JSON
+    кодируется одним заранее созданным C-кодировщиком стандартной
+    библиотеки, без json.dumps и нового кодировщика на каждый ответ.
+    iter_render() отдаёт большие списки пачками элементов, не собирая
+    весь ответ в одну строку.
+    """
+    chunk_size = 100
+
+    def get_encoder(self):
+        encoder = getattr(type(self), '_encoder', None)
+        if encoder is None:
+            encoder = type(self)._encoder = self.encoder_class(
+                ensure_ascii=self.ensure_ascii,
+                allow_nan=not self.strict,
+                separators=SHORT_SEPARATORS,
+            )
+        return encoder
+
+    def encode(self, data):
+        text = self.get_encoder().encode(data)
+        return text.replace('\u2028', '\\u2028').replace(
+            '\u2029', '\\u2029'
+        ).encode()
+
+    def is_compact(self, accepted_media_type, renderer_context):
+        return self.compact and self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ) is None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not self.is_compact(accepted_media_type,
+                                               renderer_context):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        return self.encode(data)
+
+    def iter_render(self, data, accepted_media_type=None,
+                    renderer_context=None):
+        if data is None or not self.is_compact(accepted_media_type,
+                                               renderer_context):
+            yield self.render(data, accepted_media_type, renderer_context)
+        else:
+            yield from self.iter_encode(data)
+
+    def iter_encode(self, data):
+        if isinstance(data, list):
+            yield from self.iter_list(data)
+        elif isinstance(data, dict) and all(isinstance(key, str)
+                                            for key in data):
+            yield b'{'
+            for number, (key, value) in enumerate(data.items()):
+                prefix = b',' if number else b''
+                yield prefix + self.encode(key) + b':'
+                if isinstance(value, list):
+                    yield from self.iter_list(value)
+                else:
+                    yield self.encode(value)
+            yield b'}'
+        else:
+            yield self.encode(data)
+
+    def iter_list(self, items):
+        yield b'['
+        for start in range(0, len(items), self.chunk_size):
+            chunk = b','.join(
+                self.encode(item)
+                for item in items[start:start + self.chunk_size]
+            )
+            yield b',' + chunk if start else chunk
+        yield b']'
+
+
+def count_items(data):
+    if isinstance(data, dict):
+        data = data.get('results')
+    return len(data) if isinstance(data, list) else 0
+
+
+class StreamingResponseMixin:
+    """
+    Отдаёт через StreamingHttpResponse ответы со списком не короче
+    STREAMING_RESPONSE_MIN_ITEMS элементов, если выбран
+    StreamingJSONRenderer. Заголовки ответа (ETag, Vary и др.) сохраняются.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        renderer = getattr(response, 'accepted_renderer', None)
+        if (not isinstance(response, Response)
+                or response.status_code != 200
+                or not isinstance(renderer, StreamingJSONRenderer)
+                or count_items(response.data)
+                < settings.STREAMING_RESPONSE_MIN_ITEMS):
+            return response
+        streaming = StreamingHttpResponse(
+            renderer.iter_render(
+                response.data, response.accepted_media_type,
+                response.renderer_context
+            ),
+            status=response.status_code,
+            content_type=renderer.media_type,
+        )
+        for header, value in response.items():
+            if header.lower() != 'content-type':
+                streaming[header] = value
+        return streaming
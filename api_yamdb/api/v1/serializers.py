@@ -1,36 +1,59 @@
-from django.db.models import Avg
+from django.db.models import Q
 from rest_framework import serializers
 
-from reviews.models import Category, Comments, Genre, Review, Title
+from api.v1.fieldsets import SparseFieldsetSerializerMixin
+
+from reviews.models import (
+    Category,
+    Comments,
+    Genre,
+    LeaderboardEntry,
+    Review,
+    Title
+)
 from users.models import User
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetSerializerMixin,
+                         serializers.ModelSerializer):
     class Meta:
         exclude = ['id']
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsetSerializerMixin,
+                      serializers.ModelSerializer):
     class Meta:
         exclude = ['id']
         model = Genre
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsetSerializerMixin,
+                      serializers.ModelSerializer):
     genre = GenreSerializer(
         read_only=True,
         many=True
     )
     category = CategorySerializer(read_only=True)
     rating = serializers.IntegerField(required=False)
+    weighted_rating = serializers.FloatField(read_only=True)
+    score_histogram = serializers.ListField(
+        child=serializers.IntegerField(),
+        read_only=True
+    )
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating', 'description',
-                  'genre', 'category')
+        fields = ('id', 'name', 'year', 'rating', 'weighted_rating',
+                  'description', 'genre', 'category', 'score_histogram')
         read_only_fields = ('id',)
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('score_histogram', True):
+            fields.pop('score_histogram', None)
+        return fields
+
 
 class CreateTitleSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
@@ -45,11 +68,7 @@ class CreateTitleSerializer(serializers.ModelSerializer):
     rating = serializers.SerializerMethodField()
 
     def get_rating(self, obj):
-        try:
-            rating = obj.reviews.aggregate(Avg('score'))
-            return rating.get('score__avg')
-        except TypeError:
-            return None
+        return obj.rating
 
     class Meta:
         fields = ('id', 'name', 'year', 'description',
@@ -57,7 +76,19 @@ class CreateTitleSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class ReviewsSerializer(serializers.ModelSerializer):
+class LeaderboardSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='title_id')
+    name = serializers.CharField(source='title.name')
+    year = serializers.IntegerField(source='title.year')
+    rating = serializers.IntegerField()
+
+    class Meta:
+        fields = ('id', 'name', 'year', 'rating')
+        model = LeaderboardEntry
+
+
+class ReviewsSerializer(SparseFieldsetSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username'
@@ -67,6 +98,13 @@ class ReviewsSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
         model = Review
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get('text_preview') and 'text' in fields:
+            fields['text'] = serializers.CharField(source='text_preview',
+                                                   read_only=True)
+        return fields
+
     def validate(self, data):
         if self.context['request'].method != 'POST':
             return data
@@ -82,7 +120,8 @@ class ReviewsSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentsSerializer(serializers.ModelSerializer):
+class CommentsSerializer(SparseFieldsetSerializerMixin,
+                         serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username'
@@ -93,6 +132,29 @@ class CommentsSerializer(serializers.ModelSerializer):
         model = Comments
 
 
+class TitleExportSerializer(TitleSerializer):
+    score_histogram = None
+
+    class Meta(TitleSerializer.Meta):
+        fields = ('id', 'name', 'year', 'rating', 'weighted_rating',
+                  'description', 'genre', 'category', 'updated_at')
+
+
+class ReviewExportSerializer(ReviewsSerializer):
+    title = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta(ReviewsSerializer.Meta):
+        fields = ('id', 'title', 'text', 'author', 'score', 'pub_date',
+                  'updated_at')
+
+
+class CommentExportSerializer(CommentsSerializer):
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta(CommentsSerializer.Meta):
+        fields = ('id', 'review', 'text', 'author', 'pub_date', 'updated_at')
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ("username", "email", "first_name",
@@ -118,25 +180,54 @@ class RegisterDataSerializer(serializers.Serializer):
         required=True
     )
 
+    # Занятость имени и адреса проверяют уникальные индексы при INSERT,
+    # см. get_duplicate_errors.
+    duplicate_messages = {
+        'username': 'Пользователь с таким именем уже зарегистрирован',
+        'email': 'Пользователь с таким email уже зарегистрирован',
+    }
+
     def validate_username(self, username):
         if username.lower() == "me":
             raise serializers.ValidationError("Username 'me' is not valid")
-        duplicated_username = User.objects.filter(
-            username=username
-        ).exists()
-        if duplicated_username:
-            raise serializers.ValidationError(
-                'Пользователь с таким именем уже зарегистрирован'
-            )
         return username
 
-    def validate_email(self, email):
-        duplicated_email = User.objects.filter(email=email).exists()
-        if duplicated_email:
+    def create(self, validated_data):
+        return User.objects.create(**validated_data)
+
+    def get_duplicate_errors(self):
+        """
+        Ошибки по занятым полям после IntegrityError: СУБД сообщает только
+        о первом нарушенном ограничении, а ответ должен назвать все.
+        """
+        data = self.validated_data
+        taken = User.objects.filter(
+            Q(username=data['username']) | Q(email=data['email'])
+        ).values_list('username', 'email')
+        errors = {}
+        for username, email in taken:
+            for field, value in (('username', username), ('email', email)):
+                if value == data[field]:
+                    errors[field] = [self.duplicate_messages[field]]
+        return errors
+
+
+class AvailabilitySerializer(serializers.Serializer):
+    username = serializers.CharField(
+        max_length=150,
+        required=False
+    )
+    email = serializers.EmailField(
+        max_length=150,
+        required=False
+    )
+
+    def validate(self, data):
+        if not data:
             raise serializers.ValidationError(
-                'Пользователь с таким email уже зарегистрирован'
+                'Укажите username или email для проверки'
             )
-        return email
+        return data
 
 
 class TokenSerializer(serializers.Serializer):
@@ -0,0 +1,63 @@
+import hashlib
+from collections.abc import Mapping
+
+from rest_framework.throttling import SimpleRateThrottle
+
+from api.v1.caching import get_cache
+
+
+class SharedCacheRateThrottle(SimpleRateThrottle):
+    """
+    Скользящее окно DRF со счётчиками в кэше API (`API_CACHE_ALIAS`):
+    при общем кэше (file, database) лимит действует на все воркеры сразу.
+    Ни пользователь, ни другие данные из БД для проверки не нужны.
+    """
+
+    @property
+    def cache(self):
+        return get_cache()
+
+
+class IPRateThrottle(SharedCacheRateThrottle):
+    """Лимит запросов с одного IP-адреса."""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class UsernameRateThrottle(SharedCacheRateThrottle):
+    """Лимит запросов для одного `username` из тела запроса с любых адресов."""
+
+    def get_cache_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': hashlib.md5(username.encode()).hexdigest(),
+        }
+
+
+class SignupRateThrottle(IPRateThrottle):
+    scope = 'signup'
+
+
+class SignupUsernameRateThrottle(UsernameRateThrottle):
+    scope = 'signup_username'
+
+
+class TokenRateThrottle(IPRateThrottle):
+    scope = 'token'
+
+
+class TokenUsernameRateThrottle(UsernameRateThrottle):
+    scope = 'token_username'
+
+
+class AvailabilityRateThrottle(IPRateThrottle):
+    scope = 'availability'
@@ -5,9 +5,12 @@ from api.v1.views import (
     CategoryViewSet,
     CommentViewSet,
     GenresViewSet,
+    LeaderboardViewSet,
     ReviewsViewSet,
     TitleViewSet,
     UserViewSet,
+    check_availability,
+    export,
     get_jwt_token,
     register
 )
@@ -19,6 +22,11 @@ v1_router.register(
     r'titles', TitleViewSet,
     basename='title'
 )
+v1_router.register(
+    r'^leaderboards/(?P<kind>category|genre)/(?P<slug>[-\w]+)',
+    LeaderboardViewSet,
+    basename='leaderboards'
+)
 v1_router.register(
     r'^titles/(?P<title_id>\d+)/reviews', ReviewsViewSet,
     basename='reviews'
@@ -32,6 +40,8 @@ v1_router.register(r'users', UserViewSet)
 
 urlpatterns = [
     path('', include(v1_router.urls)),
+    path('export/', export, name='export'),
     path('auth/signup/', register, name='register'),
-    path('auth/token/', get_jwt_token, name='token')
+    path('auth/token/', get_jwt_token, name='token'),
+    path('auth/availability/', check_availability, name='availability')
 ]
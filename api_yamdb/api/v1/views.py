@@ -1,14 +1,21 @@
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Substr
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.tokens import default_token_generator
+from django.utils import dateparse, timezone
 
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
-from rest_framework.pagination import PageNumberPagination
 from rest_framework import permissions, status, viewsets, filters
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (
+    action,
+    api_view,
+    authentication_classes,
+    permission_classes,
+    throttle_classes
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.mixins import (
     CreateModelMixin,
     DestroyModelMixin,
@@ -17,16 +24,35 @@ from rest_framework.mixins import (
 from rest_framework.viewsets import GenericViewSet
 from api_yamdb.settings import DEFAULT_FROM_EMAIL
 
+from api.v1.authentication import ClaimsAccessToken, get_user_instance
+from api.v1.availability import availability_index
+from api.v1.caching import (
+    CachedListModelMixin,
+    CachedRetrieveModelMixin,
+    ConditionalListModelMixin,
+    ConditionalRetrieveModelMixin
+)
+from api.v1.export import EXPORT_RESOURCES, iter_export
+from api.v1.fastpath import FastListModelMixin
+from api.v1.fieldsets import SparseFieldsetMixin
+from api.v1.pagination import (
+    CachedCountPagination,
+    NewestFirstPagination,
+    TitlePagination
+)
 from api.v1.permissions import (
     AdminOnly,
     AdminOrReadOnly,
     IsAdminModeratorAuthorOrReadOnly,
 )
+from api.v1.renderers import StreamingResponseMixin
 from api.v1.serializers import (
+    AvailabilitySerializer,
     CategorySerializer,
     CommentsSerializer,
     CreateTitleSerializer,
     GenreSerializer,
+    LeaderboardSerializer,
     RegisterDataSerializer,
     ReviewsSerializer,
     TitleSerializer,
@@ -34,85 +60,227 @@ from api.v1.serializers import (
     UserEditSerializer,
     UserSerializer
 )
+from api.v1.throttling import (
+    AvailabilityRateThrottle,
+    SignupRateThrottle,
+    SignupUsernameRateThrottle,
+    TokenRateThrottle,
+    TokenUsernameRateThrottle
+)
 
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import (
+    Category,
+    Comments,
+    Genre,
+    LeaderboardEntry,
+    Review,
+    Title
+)
 from users.models import User
-from api.v1.filters import TitleFilter
+from users.outbox import queue_email
+from api.v1.filters import (
+    ReviewFilter,
+    StableOrderingFilter,
+    TitleFilter,
+    TitleSearchFilter
+)
 
 
-class CategoryViewSet(CreateModelMixin, ListModelMixin,
-                      DestroyModelMixin, GenericViewSet):
+class CategoryViewSet(StreamingResponseMixin, SparseFieldsetMixin,
+                      CachedListModelMixin, FastListModelMixin,
+                      CreateModelMixin, ListModelMixin, DestroyModelMixin,
+                      GenericViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [AdminOrReadOnly]
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_dependencies = (Category,)
 
 
-class GenresViewSet(CreateModelMixin, ListModelMixin,
-                    DestroyModelMixin, GenericViewSet):
+class GenresViewSet(StreamingResponseMixin, SparseFieldsetMixin,
+                    CachedListModelMixin, FastListModelMixin,
+                    CreateModelMixin, ListModelMixin, DestroyModelMixin,
+                    GenericViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [AdminOrReadOnly]
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_dependencies = (Genre,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(StreamingResponseMixin, SparseFieldsetMixin,
+                   ConditionalListModelMixin, ConditionalRetrieveModelMixin,
+                   CachedListModelMixin, CachedRetrieveModelMixin,
+                   FastListModelMixin, viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = [AdminOrReadOnly]
-    pagination_class = PageNumberPagination
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    pagination_class = TitlePagination
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter,
+                       filters.OrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ('rating', 'weighted_rating', 'year', 'name')
+    # Отзывы меняют рейтинг через update() без сигналов Title, а от
+    # рейтинга зависят `?rating_min=`/`?rating_max=` и число записей.
+    count_dependencies = (Title, Title.genre.through, Category, Genre,
+                          Review)
+    cache_dependencies = count_dependencies
 
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
+
+    histogram_query_param = 'histogram'
 
     def get_serializer_class(self):
         if self.action in ('partial_update', 'create'):
             return CreateTitleSerializer
         return TitleSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # В списке гистограмма оценок выводится только по запросу.
+        context['score_histogram'] = (
+            self.action != 'list'
+            or self.request.query_params.get(
+                self.histogram_query_param
+            ) == 'true'
+            or 'score_histogram' in (context['fields'] or ())
+        )
+        return context
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+
+class LeaderboardViewSet(StreamingResponseMixin, CachedListModelMixin,
+                         ListModelMixin, GenericViewSet):
+    """Топ произведений категории или жанра по рейтингу."""
+    serializer_class = LeaderboardSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = None
+    cache_dependencies = (Title, Title.genre.through, Category, Genre,
+                          Review)
+    limit = 50
+
+    def get_queryset(self):
+        kind = self.kwargs.get('kind')
+        slug = self.kwargs.get('slug')
+        # Отдельный поиск категории или жанра не нужен: slug
+        # сопоставляется в том же запросе, что читает топ по индексу.
+        return LeaderboardEntry.objects.filter(
+            **{f'{kind}__slug': slug}
+        ).select_related('title').order_by('-rating', 'title')[:self.limit]
+
+
+class ReviewsViewSet(StreamingResponseMixin, SparseFieldsetMixin,
+                     ConditionalListModelMixin, ConditionalRetrieveModelMixin,
+                     FastListModelMixin, viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = [
         IsAdminModeratorAuthorOrReadOnly,
         permissions.IsAuthenticatedOrReadOnly
     ]
     serializer_class = ReviewsSerializer
+    pagination_class = NewestFirstPagination
+    filter_backends = (DjangoFilterBackend, StableOrderingFilter)
+    filterset_class = ReviewFilter
+    ordering_fields = ('score', 'pub_date')
+    ordering = ('-pub_date', '-id')
+    text_preview_query_param = 'text_preview'
+
+    def get_validator_dependencies(self):
+        title_id = self.kwargs.get('title_id')
+        return (
+            (Title, f'id={title_id}'),
+            (Review, f'title_id={title_id}'),
+        )
+
+    def get_title_id(self):
+        title_id = self.kwargs.get('title_id')
+        if not Title.objects.filter(id=title_id).exists():
+            raise Http404
+        return title_id
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        # Для отдельного отзыва фильтр по title_id сам даёт 404, проверять
+        # существование произведения нужно только для списка.
+        title_id = (self.get_title_id() if self.action == 'list'
+                    else self.kwargs.get('title_id'))
+        queryset = Review.objects.filter(
+            title_id=title_id
+        ).select_related('author')
+        text_preview = self.get_text_preview()
+        if text_preview:
+            # Полный текст не читается: SQLite отдаёт только начало.
+            queryset = queryset.defer('text').annotate(
+                text_preview=Substr('text', 1, text_preview)
+            )
+        return queryset
+
+    def get_text_preview(self):
+        if self.action not in self.sparse_fieldset_actions:
+            return None
+        value = self.request.query_params.get(self.text_preview_query_param)
+        if value is None:
+            return None
+        if not value.isdigit() or int(value) < 1:
+            raise ValidationError({
+                self.text_preview_query_param: 'Ожидается целое число > 0.'
+            })
+        return int(value)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['text_preview'] = bool(self.get_text_preview())
+        return context
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user,
+                        title_id=self.get_title_id())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(StreamingResponseMixin, SparseFieldsetMixin,
+                     ConditionalListModelMixin, ConditionalRetrieveModelMixin,
+                     FastListModelMixin, viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = [
         IsAdminModeratorAuthorOrReadOnly,
         permissions.IsAuthenticatedOrReadOnly
     ]
     serializer_class = CommentsSerializer
+    pagination_class = NewestFirstPagination
+
+    def get_validator_dependencies(self):
+        review_id = self.kwargs.get('review_id')
+        return (
+            (Review, f'id={review_id}'),
+            (Comments, f'review_id={review_id}'),
+        )
+
+    def get_review_id(self):
+        review_id = self.kwargs.get('review_id')
+        if not Review.objects.filter(
+            id=review_id, title_id=self.kwargs.get('title_id')
+        ).exists():
+            raise Http404
+        return review_id
 
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'),
-                                   title_id=self.kwargs.get('title_id'))
-        return review.comments.all()
+        if self.action == 'list':
+            review_filter = {'review_id': self.get_review_id()}
+        else:
+            review_filter = {'review_id': self.kwargs.get('review_id'),
+                             'review__title_id': self.kwargs.get('title_id')}
+        return Comments.objects.filter(
+            **review_filter
+        ).select_related('author')
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review, id=self.kwargs.get('review_id'),
-            title_id=self.kwargs.get('title_id')
-        )
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user,
+                        review_id=self.get_review_id())
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -136,6 +304,7 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         user = request.user
         if request.method == "GET":
+            user = get_user_instance(user)
             serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -150,36 +319,65 @@ class UserViewSet(viewsets.ModelViewSet):
 
 
 @api_view(["POST"])
+@authentication_classes([])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([SignupRateThrottle, SignupUsernameRateThrottle])
 def register(request):
     """
     Функция обрабатывает POST-запрос для регистрации нового пользователя и
     получаения кода подтверждения, который необходим для получения JWT-токена.
-    На вход подается 'username' и 'email', а в ответ происходит отправка
-    на почту письма с кодом подтверждения.
+    На вход подается 'username' и 'email', а письмо с кодом подтверждения
+    ставится в очередь; отправляет его команда `send_emails`.
     """
     serializer = RegisterDataSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
 
-    user, created = User.objects.get_or_create(
-        username=serializer.validated_data["username"],
-        email=serializer.validated_data["email"],
-    )
+    # Пользователь и письмо записываются одной транзакцией; занятые имя
+    # или email отсекают уникальные индексы, а не отдельные SELECT.
+    try:
+        with transaction.atomic():
+            user = serializer.save()
+            confirmation_code = default_token_generator.make_token(user)
+            queue_email(
+                subject="YaMDb registration",
+                message=f"Your confirmation code: {confirmation_code}",
+                from_email=DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+            )
+    except IntegrityError:
+        errors = serializer.get_duplicate_errors()
+        if not errors:
+            raise
+        raise ValidationError(errors)
 
-    confirmation_code = default_token_generator.make_token(user)
+    return Response(serializer.data, status=status.HTTP_200_OK)
 
-    send_mail(
-        subject="YaMDb registration",
-        message=f"Your confirmation code: {confirmation_code}",
-        from_email=DEFAULT_FROM_EMAIL,
-        recipient_list=[user.email],
-    )
 
-    return Response(serializer.data, status=status.HTTP_200_OK)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([AvailabilityRateThrottle])
+def check_availability(request):
+    """
+    Функция обрабатывает GET-запрос `?username=...&email=...` и сообщает,
+    свободны ли имя пользователя и email для регистрации. Значения, которых
+    точно нет в базе, отсеиваются фильтром Блума без запросов к БД.
+    """
+    serializer = AvailabilitySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    available = {
+        field: availability_index.is_available(field, value)
+        for field, value in serializer.validated_data.items()
+    }
+    if serializer.validated_data.get("username", "").lower() == "me":
+        available["username"] = False
+    return Response(available, status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
+@authentication_classes([])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([TokenRateThrottle, TokenUsernameRateThrottle])
 def get_jwt_token(request):
     """
     Функция обрабатывает POST-запрос для получаения JWT-токена.
@@ -196,7 +394,49 @@ def get_jwt_token(request):
     if default_token_generator.check_token(
             user, serializer.validated_data["confirmation_code"]
     ):
-        token = AccessToken.for_user(user)
+        token = ClaimsAccessToken.for_user(user)
         return Response({"token": str(token)}, status=status.HTTP_200_OK)
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(["GET"])
+@permission_classes([AdminOnly])
+def export(request):
+    """
+    Потоковая выгрузка каталога в формате NDJSON: по одной JSON-записи
+    вида {"type": ..., "data": ...} на строку. `?resources=titles,reviews`
+    ограничивает набор ресурсов, `?updated_since=<ISO 8601>` оставляет
+    только записи, изменённые не раньше указанного момента. Заголовок
+    `X-Export-Timestamp` содержит момент начала выгрузки — его удобно
+    передать в `updated_since` при следующей инкрементальной выгрузке.
+    """
+    started_at = timezone.now()
+    params = request.query_params
+    resources = [
+        name.strip() for name in params.get('resources', '').split(',')
+        if name.strip()
+    ] or list(EXPORT_RESOURCES)
+    unknown = [name for name in resources if name not in EXPORT_RESOURCES]
+    if unknown:
+        raise ValidationError({
+            'resources': f'Неизвестные ресурсы: {", ".join(unknown)}.'
+        })
+    updated_since = params.get('updated_since')
+    if updated_since is not None:
+        try:
+            updated_since = dateparse.parse_datetime(updated_since)
+        except ValueError:
+            updated_since = None
+        if updated_since is None:
+            raise ValidationError({
+                'updated_since': 'Ожидается дата и время в формате ISO 8601.'
+            })
+        if timezone.is_naive(updated_since):
+            updated_since = timezone.make_aware(updated_since)
+    response = StreamingHttpResponse(
+        iter_export(list(dict.fromkeys(resources)), updated_since),
+        content_type='application/x-ndjson'
+    )
+    response['X-Export-Timestamp'] = started_at.isoformat()
+    return response
@@ -29,8 +29,8 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'django_filters',
-    'reviews',
-    'api'
+    'reviews.apps.ReviewsConfig',
+    'api.v1.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
@@ -75,6 +75,35 @@ DATABASES = {
 }
 
 
+# Cache
+# `default` живёт в памяти процесса. Для нескольких воркеров нужен общий
+# кэш: `file` (каталог на диске) или `database` (таблица в SQLite,
+# создаётся командой `python manage.py createcachetable`).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yamdb',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'database': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'api_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+API_CACHE_ALIAS = os.getenv('API_CACHE_ALIAS', 'default')
+
+# Время жизни закэшированных ответов API, в секундах.
+RESPONSE_CACHE_TIMEOUT = 300
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -120,17 +149,72 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 DEFAULT_FROM_EMAIL = 'admin@yamdb.com'
 
+# Очередь писем (users.OutgoingEmail), которую разбирает команда
+# `send_emails`: размер пачки на одно соединение с почтовым сервером,
+# число попыток, задержка перед первым повтором (дальше удваивается)
+# и пауза между опросами пустой очереди, в секундах.
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_OUTBOX_POLL_INTERVAL = 5
+# Столько секунд письмо, взятое воркером, не видно другим воркерам; если
+# воркер упал, не отправив его, письмо уйдёт повторно после этого срока.
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 600
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.v1.authentication.ClaimsJWTAuthentication",
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.v1.renderers.StreamingJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.v1.pagination.CachedCountPagination',
     'PAGE_SIZE': 10,
+    # Лимиты `/auth/signup/` и `/auth/token/`: с одного IP и для одного
+    # username; счётчики хранятся в кэше API (см. api/v1/throttling.py).
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '20/min',
+        'signup_username': '5/min',
+        'token': '30/min',
+        'token_username': '10/min',
+        'availability': '120/min',
+    },
+    # IP для лимитов берётся из REMOTE_ADDR: X-Forwarded-For подделывается
+    # клиентом. За обратным прокси укажите число прокси перед приложением.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
+# Ответы со списком от стольких элементов отдаются потоком
+# (StreamingHttpResponse), а не одной строкой.
+STREAMING_RESPONSE_MIN_ITEMS = 200
+
+# Размер пачки строк при потоковой выгрузке каталога (`/api/v1/export/`).
+EXPORT_CHUNK_SIZE = 1000
+
+# Время жизни закэшированного `count` в ответах с пагинацией, в секундах.
+COUNT_CACHE_TIMEOUT = 30
+
+# Списки каталога, отзывов и комментариев собираются из values() без
+# сериализаторов DRF (ответ тот же, см. api/v1/fastpath.py).
+FAST_LIST_SERIALIZATION = True
+
+# Вес априорной оценки во взвешенном рейтинге: столько «средних по
+# каталогу» отзывов добавляется к отзывам каждого произведения.
+WEIGHTED_RATING_PRIOR_REVIEWS = 10
+
+# Фильтр Блума для `/auth/availability/`: доля ложных срабатываний
+# (они проверяются по БД) и минимальная ёмкость в пользователях.
+USER_AVAILABILITY_ERROR_RATE = 0.01
+USER_AVAILABILITY_MIN_CAPACITY = 1000
+
+# Сколько проверенных JWT держать в памяти процесса (LRU), чтобы не
+# проверять подпись одного и того же токена на каждый запрос.
+JWT_TOKEN_CACHE_SIZE = 1024
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
@@ -0,0 +1,65 @@
+from reviews.models import LeaderboardEntry, Title
+
+
+def build_entries(titles):
+    """Строки топов для произведений из словарей с id, rating, category_id."""
+    titles = {title['id']: title for title in titles}
+    entries = [
+        LeaderboardEntry(title_id=title['id'],
+                         category_id=title['category_id'],
+                         rating=title['rating'])
+        for title in titles.values()
+        if title['category_id'] is not None
+    ]
+    links = Title.genre.through.objects.filter(
+        title_id__in=titles
+    ).values_list('title_id', 'genre_id')
+    entries.extend(
+        LeaderboardEntry(title_id=title_id, genre_id=genre_id,
+                         rating=titles[title_id]['rating'])
+        for title_id, genre_id in links
+    )
+    return entries
+
+
+def refresh_title_leaderboards(title_id):
+    """Пересобирает все строки топов одного произведения."""
+    LeaderboardEntry.objects.filter(title_id=title_id).delete()
+    titles = Title.objects.filter(
+        pk=title_id, rating__isnull=False
+    ).values('id', 'rating', 'category_id')
+    LeaderboardEntry.objects.bulk_create(build_entries(titles))
+
+
+def update_title_rating(title_id, allow_insert=True):
+    """
+    Переносит в топы новый рейтинг произведения. При удалении отзыва
+    строки не добавляются: отзыв может удаляться каскадно вместе с
+    произведением, и новые строки сослались бы на удалённую запись.
+    """
+    rating = Title.objects.filter(
+        pk=title_id
+    ).values_list('rating', flat=True).first()
+    entries = LeaderboardEntry.objects.filter(title_id=title_id)
+    if rating is None:
+        entries.delete()
+    elif not entries.update(rating=rating) and allow_insert:
+        refresh_title_leaderboards(title_id)
+
+
+def rebuild_leaderboards(batch_size=1000):
+    """Пересобирает таблицу топов с нуля. Возвращает число строк."""
+    LeaderboardEntry.objects.all().delete()
+    titles = Title.objects.filter(
+        rating__isnull=False
+    ).order_by('id').values('id', 'rating', 'category_id')
+    created = 0
+    last_id = 0
+    while True:
+        batch = list(titles.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return created
+        entries = build_entries(batch)
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=batch_size)
+        created += len(entries)
+        last_id = batch[-1]['id']
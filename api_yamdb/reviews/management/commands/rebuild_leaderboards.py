@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Rebuild category and genre leaderboards from title ratings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created = rebuild_leaderboards(batch_size=options['batch_size'])
+        self.stdout.write(f'Leaderboards rebuilt: {created} entries')
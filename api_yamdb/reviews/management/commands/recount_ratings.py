@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api.v1.caching import bump_version
+from reviews.models import Title
+from reviews.ratings import recount_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recount stored title ratings from reviews.'
+
+    def handle(self, *args, **options):
+        updated = recount_ratings()
+        # UPDATE не отправляет сигналы, кэш ответов и count сбрасываем сами.
+        bump_version(Title)
+        self.stdout.write(f'Ratings recounted for {updated} titles')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api.v1.caching import bump_version
+from reviews.models import Title
+from reviews.ratings import recount_weighted_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recount Bayesian weighted title ratings from reviews.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prior-reviews', type=int, default=None,
+            help='Weight of the catalog mean, in reviews.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = recount_weighted_ratings(
+            prior_reviews=options['prior_reviews'],
+            batch_size=options['batch_size']
+        )
+        # bulk_update не отправляет сигналы, кэш ответов сбрасываем сами.
+        bump_version(Title)
+        self.stdout.write(f'Weighted ratings recounted for {updated} titles')
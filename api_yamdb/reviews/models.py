@@ -1,10 +1,17 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.db import models
+from django.db import models, transaction
 
 User = get_user_model()
 
+SCORES = range(1, 11)
+
+
+def score_count_field(score):
+    """Имя поля Title со счётчиком отзывов с данной оценкой."""
+    return f'score_{score}_count'
+
 
 class Category(models.Model):
     name = models.CharField(max_length=50, verbose_name='Название')
@@ -54,6 +61,88 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Жанр'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок'
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов'
+    )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name='Рейтинг'
+    )
+    weighted_rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name='Взвешенный рейтинг'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
+    # Гистограмма оценок — десять счётчиков прямо в строке произведения:
+    # читается вместе с ним и сдвигается тем же UPDATE, что и рейтинг
+    # (имена полей — score_count_field()).
+    score_1_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Отзывов с оценкой 1'
+    )
+    score_2_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Отзывов с оценкой 2'
+    )
+    score_3_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Отзывов с оценкой 3'
+    )
+    score_4_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Отзывов с оценкой 4'
+    )
+    score_5_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Отзывов с оценкой 5'
+    )
+    score_6_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Отзывов с оценкой 6'
+    )
+    score_7_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Отзывов с оценкой 7'
+    )
+    score_8_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Отзывов с оценкой 8'
+    )
+    score_9_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Отзывов с оценкой 9'
+    )
+    score_10_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Отзывов с оценкой 10'
+    )
 
     class Meta:
         verbose_name = 'Тайтл'
@@ -69,6 +158,11 @@ class Title(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def score_histogram(self):
+        """Количество отзывов с каждой оценкой от 1 до 10."""
+        return [getattr(self, score_count_field(score)) for score in SCORES]
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -86,8 +180,8 @@ class Review(models.Model):
     )
     score = models.IntegerField(
         validators=[
-            MinValueValidator(1),
-            MaxValueValidator(10)
+            MinValueValidator(SCORES[0]),
+            MaxValueValidator(SCORES[-1])
         ],
         verbose_name='Рейтинг'
     )
@@ -95,15 +189,65 @@ class Review(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         unique_together = ['author', 'title']
+        ordering = ['-pub_date', '-id']
+        # Новые отзывы произведения читаются обратным проходом по индексу;
+        # в SQLite он неявно заканчивается rowid (= id).
+        indexes = [
+            models.Index(fields=['title', 'pub_date'],
+                         name='review_title_pub_date_idx'),
+            models.Index(fields=['title', 'score', 'pub_date'],
+                         name='review_title_score_idx'),
+        ]
 
     def __str__(self):
         return f'{self.title} {self.text} {self.author} {self.score}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Оценка на момент загрузки нужна, чтобы при изменении отзыва
+        # пересчитать рейтинг произведения на разницу, а не целиком.
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def lock_stored_score(self):
+        """
+        Оценка отзыва в БД под блокировкой строки до конца транзакции.
+        Оценка, загруженная вместе с экземпляром, могла устареть, пока
+        отзыв менял другой запрос, и сдвиг счётчиков на неё уводил бы
+        гистограмму произведения ниже нуля.
+        """
+        return type(self).objects.select_for_update().filter(
+            pk=self.pk
+        ).values_list('score', flat=True).first()
+
+    def save(self, *args, **kwargs):
+        # Отзыв и счётчики произведения (сигнал post_save) меняются в одной
+        # транзакции.
+        with transaction.atomic():
+            if not self._state.adding and self.pk is not None:
+                self._loaded_score = self.lock_stored_score()
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            score = self.lock_stored_score()
+            if score is None:
+                # Отзыв уже удалён, его оценка уже вычтена из счётчиков.
+                return 0, {}
+            self.score = score
+            return super().delete(*args, **kwargs)
+
 
 class Comments(models.Model):
     review = models.ForeignKey(
@@ -122,10 +266,68 @@ class Comments(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(fields=['review', 'pub_date'],
+                         name='comment_review_pub_date_idx'),
+        ]
 
     def __str__(self):
         return f'{self.author} {self.text}'
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Материализованный рейтинг: строка на каждую пару (произведение,
+    категория) и (произведение, жанр) для произведений с оценками.
+    Топ категории или жанра читается одним проходом по индексу.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name='Произведение'
+    )
+    category = models.ForeignKey(
+        Category,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name='Категория'
+    )
+    genre = models.ForeignKey(
+        Genre,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name='Жанр'
+    )
+    rating = models.FloatField(verbose_name='Рейтинг')
+
+    class Meta:
+        verbose_name = 'Позиция в топе'
+        verbose_name_plural = 'Топы'
+        indexes = [
+            models.Index(
+                fields=['category', '-rating', 'title'],
+                name='leaderboard_category_idx'
+            ),
+            models.Index(
+                fields=['genre', '-rating', 'title'],
+                name='leaderboard_genre_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.category or self.genre} {self.title} {self.rating}'
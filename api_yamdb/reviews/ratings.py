@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from reviews.models import SCORES, Review, Title, score_count_field
+
+
+def average(rating_sum, review_count):
+    """Выражение среднего; NULL, если отзывов нет."""
+    return Cast(rating_sum, FloatField()) / NullIf(review_count, 0)
+
+
+def apply_review_change(title_id, added=None, removed=None):
+    """
+    Атомарно сдвигает сохранённые счётчики рейтинга и гистограмму оценок
+    произведения: added — новая оценка, removed — прежняя (None при
+    создании и удалении отзыва соответственно); сдвигает и updated_at,
+    чтобы новый рейтинг попал в выгрузку. Правые части UPDATE
+    видят значения до изменения, поэтому рейтинг считается от уже
+    сдвинутых сумм.
+    """
+    rating_sum = F('rating_sum') + (added or 0) - (removed or 0)
+    review_count = F('review_count') + (
+        (added is not None) - (removed is not None)
+    )
+    changes = {}
+    if added is not None:
+        changes[score_count_field(added)] = F(score_count_field(added)) + 1
+    if removed is not None:
+        field = score_count_field(removed)
+        changes[field] = changes.get(field, F(field)) - 1
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        review_count=review_count,
+        rating=average(rating_sum, review_count),
+        updated_at=timezone.now(),
+        **changes
+    )
+
+
+def recount_ratings(queryset=None):
+    """
+    Пересчитывает счётчики, гистограмму и рейтинг с нуля по таблице
+    отзывов, не выбирая строки в Python. Возвращает количество
+    обновлённых произведений.
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    histogram = {
+        score_count_field(score): Coalesce(
+            Subquery(reviews.filter(score=score).annotate(
+                total=Count('id')
+            ).values('total')),
+            0
+        )
+        for score in SCORES
+    }
+    updated = queryset.update(
+        **histogram,
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0
+        ),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')),
+            0
+        ),
+    )
+    queryset.update(rating=average(F('rating_sum'), F('review_count')))
+    return updated
+
+
+def weighted_average(rating_sum, review_count, prior, prior_reviews):
+    """
+    Байесовское среднее: к отзывам произведения добавляется prior_reviews
+    воображаемых отзывов со средней оценкой по каталогу, поэтому
+    произведение с одной десяткой не обгоняет сотни девяток.
+    """
+    return (rating_sum + prior * prior_reviews) / (review_count
+                                                   + prior_reviews)
+
+
+def recount_weighted_ratings(prior_reviews=None, batch_size=1000):
+    """
+    Пересчитывает взвешенный рейтинг всего каталога. Суммы и количества
+    оценок по произведениям собираются одним GROUP BY по таблице
+    отзывов, среднее по каталогу выводится из них же, результат
+    записывается пачками через bulk_update только у произведений, где он
+    изменился. Возвращает количество произведений с рейтингом.
+    """
+    if prior_reviews is None:
+        prior_reviews = settings.WEIGHTED_RATING_PRIOR_REVIEWS
+    totals = list(
+        Review.objects.order_by().values('title').annotate(
+            total=Sum('score'), count=Count('id')
+        ).values_list('title', 'total', 'count')
+    )
+    reviews_count = sum(count for _, _, count in totals)
+    prior = sum(total for _, total, _ in totals) / (reviews_count or 1)
+    current = dict(Title.objects.filter(
+        weighted_rating__isnull=False
+    ).values_list('pk', 'weighted_rating'))
+    now = timezone.now()
+    titles = []
+    for title_id, total, count in totals:
+        rating = weighted_average(total, count, prior, prior_reviews)
+        # updated_at сдвигается только у изменившихся, чтобы новый
+        # рейтинг попал в выгрузку `?updated_since=`.
+        if current.get(title_id) != rating:
+            titles.append(Title(pk=title_id, weighted_rating=rating,
+                                updated_at=now))
+    Title.objects.bulk_update(titles, ['weighted_rating', 'updated_at'],
+                              batch_size=batch_size)
+    Title.objects.filter(weighted_rating__isnull=False).exclude(
+        pk__in=Review.objects.values('title')
+    ).update(weighted_rating=None, updated_at=now)
+    return len(totals)
@@ -0,0 +1,96 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from reviews.models import Title
+
+FTS_TABLE = 'reviews_title_fts'
+
+# Внешний контент: индекс хранит только токены, текст берётся из
+# reviews_title. unicode61 приводит к нижнему регистру любые буквы
+# Юникода (в том числе кириллицу), prefix ускоряет запросы вида «слово*».
+FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai "
+    "AFTER INSERT ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad "
+    "AFTER DELETE ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    "AFTER UPDATE OF name, description ON reviews_title BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+)
+FTS_TRIGGERS = (f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au')
+
+# Совпадение в названии весит больше, чем в описании.
+FTS_RANK = f'bm25({FTS_TABLE}, 10.0, 1.0)'
+
+
+def create_title_search_index(using='default'):
+    """
+    Создаёт FTS5-индекс по названию и описанию произведений и триггеры,
+    которые поддерживают его при INSERT/UPDATE/DELETE. SQLite при
+    изменении схемы пересоздаёт таблицу и теряет триггеры, поэтому
+    функция вызывается после каждого migrate и перестраивает индекс,
+    если чего-то не хватало.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        if Title._meta.db_table not in tables:
+            return
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE in tables and existing.issuperset(FTS_TRIGGERS):
+            return
+        for statement in FTS_SCHEMA:
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def build_match_query(text):
+    """
+    Переводит пользовательский ввод в запрос FTS5: каждое слово
+    берётся в кавычки (чтобы не разбирать синтаксис FTS) и ищется
+    как префикс, слова объединяются через AND.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def search_titles(queryset, text):
+    """Фильтрует произведения по тексту и сортирует по релевантности."""
+    match = build_match_query(text)
+    if not match:
+        return queryset
+    if connections[queryset.db].vendor != 'sqlite':
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    table = Title._meta.db_table
+    # Не через id__in=RawSQL(...): Django оборачивает его в лишние скобки,
+    # и SQLite считает подзапрос скалярным, отдавая только первую строку.
+    return queryset.extra(
+        where=[f'"{table}"."id" IN (SELECT rowid FROM {FTS_TABLE} '
+               f'WHERE {FTS_TABLE} MATCH %s)'],
+        params=[match],
+    ).annotate(search_rank=RawSQL(
+        f'SELECT {FTS_RANK} FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+        (match,)
+    )).order_by('search_rank', '-year')
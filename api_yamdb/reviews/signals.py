@@ -0,0 +1,65 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.leaderboards import (
+    refresh_title_leaderboards,
+    update_title_rating
+)
+from reviews.models import LeaderboardEntry, Review, Title
+from reviews.ratings import apply_review_change, recount_ratings
+from reviews.search import create_title_search_index
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    loaded_score = getattr(instance, '_loaded_score', None)
+    if created:
+        apply_review_change(instance.title_id, added=instance.score)
+    elif loaded_score is None:
+        # Исходная оценка неизвестна — пересчитываем произведение целиком.
+        recount_ratings(Title.objects.filter(pk=instance.title_id))
+    elif loaded_score != instance.score:
+        apply_review_change(instance.title_id, added=instance.score,
+                            removed=loaded_score)
+    else:
+        return
+    instance._loaded_score = instance.score
+    update_title_rating(instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    # Срабатывает и при каскадном удалении вместе с автором или
+    # произведением; для уже удалённого произведения UPDATE ничего не меняет.
+    apply_review_change(instance.title_id, removed=instance.score)
+    update_title_rating(instance.title_id, allow_insert=False)
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, raw=False, **kwargs):
+    # Новое произведение ещё без оценок и в топы не попадает.
+    if not raw and not created:
+        refresh_title_leaderboards(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        refresh_title_leaderboards(instance.pk)
+        Title.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+    elif action == 'post_clear':
+        LeaderboardEntry.objects.filter(genre=instance).delete()
+    else:
+        for title_id in pk_set:
+            refresh_title_leaderboards(title_id)
+        Title.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+
+
+def migrated(sender, using, **kwargs):
+    create_title_search_index(using)
@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = ('Deliver queued emails from the outbox, one mail connection '
+            'per batch.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--max-attempts', type=int, default=None)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting when it is empty.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Seconds to sleep between polls of an empty outbox.'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        if interval is None:
+            interval = settings.EMAIL_OUTBOX_POLL_INTERVAL
+        started = time.perf_counter()
+        total_sent = total_failed = 0
+        try:
+            while True:
+                sent, failed = deliver_batch(
+                    batch_size=options['batch_size'],
+                    max_attempts=options['max_attempts']
+                )
+                total_sent += sent
+                total_failed += failed
+                if not sent + failed and not options['loop']:
+                    break
+                if not sent and options['loop']:
+                    # Очередь пуста или почтовый сервер недоступен —
+                    # не крутим цикл вхолостую.
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        elapsed = time.perf_counter() - started
+        rate = total_sent / elapsed if elapsed else 0
+        self.stdout.write(
+            f'Sent {total_sent} emails, {total_failed} failed '
+            f'in {elapsed:.2f} s ({rate:.1f} emails/s)'
+        )
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -56,6 +57,15 @@ class User(AbstractUser):
     def is_user(self):
         return self.role == self.USER
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Имя и адрес на момент загрузки: по ним видно, что пользователя
+        # переименовали (см. api/v1/availability.py).
+        instance._loaded_identity = (instance.__dict__.get('username'),
+                                     instance.__dict__.get('email'))
+        return instance
+
 
 class Meta:
     ordering = ('username',)
@@ -65,3 +75,48 @@ class Meta:
 
 def __str__(self):
     return self.username
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в очереди на отправку. Запрос только записывает его в таблицу,
+    доставляет команда `send_emails`.
+    """
+    subject = models.CharField(verbose_name='Тема', max_length=255)
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(verbose_name='Отправитель')
+    to = models.EmailField(verbose_name='Получатель')
+    created_at = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True
+    )
+    send_after = models.DateTimeField(
+        verbose_name='Отправить не раньше',
+        default=timezone.now
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Дата отправки',
+        null=True,
+        blank=True
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток отправки',
+        default=0
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True
+    )
+
+    class Meta:
+        ordering = ('send_after', 'id')
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            # Очередь: неотправленные письма по времени следующей попытки.
+            models.Index(fields=['sent_at', 'send_after'],
+                         name='outgoing_email_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {self.to}'
@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+
+def queue_email(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь вместо send_mail: один INSERT на получателя."""
+    for recipient in recipient_list:
+        OutgoingEmail.objects.create(subject=subject, body=message,
+                                     from_email=from_email, to=recipient)
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой отправки."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def pending_emails(max_attempts, now=None):
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        send_after__lte=now or timezone.now(),
+        attempts__lt=max_attempts,
+    )
+
+
+def claim_emails(batch_size, max_attempts):
+    """
+    Забирает до batch_size писем из очереди: переносит их send_after на
+    EMAIL_OUTBOX_CLAIM_TIMEOUT секунд вперёд, чтобы другие воркеры их не
+    видели. Строки, заблокированные другим воркером, пропускаются, а
+    письмо, которое успели забрать между выборкой и обновлением, не
+    попадает в результат: UPDATE сверяет прежний send_after.
+    """
+    now = timezone.now()
+    claimed_until = now + timedelta(
+        seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+    )
+    claimed = []
+    with transaction.atomic():
+        emails = pending_emails(max_attempts, now).select_for_update(
+            skip_locked=True
+        )[:batch_size]
+        for email in emails:
+            updated = OutgoingEmail.objects.filter(
+                pk=email.pk, sent_at__isnull=True,
+                send_after=email.send_after,
+            ).update(send_after=claimed_until)
+            if updated:
+                email.send_after = claimed_until
+                claimed.append(email)
+    return claimed
+
+
+def postpone(email, error):
+    """Откладывает письмо после неудачной попытки отправки."""
+    email.attempts += 1
+    email.send_after = timezone.now() + retry_delay(email.attempts)
+    email.last_error = repr(error)
+    email.save(update_fields=['attempts', 'send_after', 'last_error'])
+
+
+def deliver_batch(batch_size=None, max_attempts=None):
+    """
+    Отправляет до batch_size писем из очереди через одно соединение с
+    почтовым сервером. Неудачные письма откладываются с растущей
+    задержкой, после max_attempts попыток — больше не отправляются;
+    если соединение не открылось, откладывается вся пачка.
+    Возвращает пару (отправлено, с ошибкой).
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    emails = claim_emails(batch_size, max_attempts)
+    if not emails:
+        return 0, 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            postpone(email, error)
+        return 0, len(emails)
+    sent = []
+    failed = 0
+    try:
+        for email in emails:
+            message = EmailMessage(email.subject, email.body,
+                                   email.from_email, [email.to],
+                                   connection=connection)
+            try:
+                message.send()
+            except Exception as error:
+                failed += 1
+                postpone(email, error)
+            else:
+                sent.append(email.pk)
+    finally:
+        connection.close()
+    OutgoingEmail.objects.filter(pk__in=sent).update(
+        sent_at=timezone.now(), last_error=''
+    )
+    return len(sent), failed
@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    from django.core.cache import caches
+    cache = caches[settings.API_CACHE_ALIAS]
+    cache.clear()
+    yield
+    cache.clear()
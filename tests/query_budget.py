@@ -0,0 +1,61 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def format_queries(queries):
+    return '\n'.join(
+        f'{number}. {query["sql"]}'
+        for number, query in enumerate(queries, start=1)
+    )
+
+
+class QueryBudget:
+    """
+    Собирает число SQL-запросов для каждого действия API на данных разного
+    размера и проверяет, что оно не превышает бюджет и не растёт вместе
+    с количеством строк. При нарушении в сообщение попадает SQL самого
+    «дорогого» прогона.
+    """
+
+    def __init__(self, budgets):
+        self.budgets = budgets
+        self.runs = {}
+
+    def measure(self, name, size, request):
+        from api.v1.caching import get_cache
+        # Закэшированный ответ не ходит в базу и скрыл бы регрессию.
+        get_cache().clear()
+        with CaptureQueriesContext(connection) as context:
+            response = request()
+        assert response.status_code < 400, (
+            f'{name}: неожиданный ответ {response.status_code} '
+            f'{response.content[:200]!r}'
+        )
+        self.runs.setdefault(name, []).append(
+            (size, context.captured_queries)
+        )
+        return response
+
+    def errors(self):
+        errors = []
+        for name, runs in self.runs.items():
+            counts = {size: len(queries) for size, queries in runs}
+            size, queries = max(runs, key=lambda run: len(run[1]))
+            budget = self.budgets[name]
+            if len(queries) > budget:
+                problem = f'{len(queries)} запросов при бюджете {budget}'
+            elif len(set(counts.values())) > 1:
+                problem = f'число запросов растёт с данными: {counts}'
+            else:
+                continue
+            errors.append(
+                f'{name}: {problem}; запросы при размере {size}:\n'
+                f'{format_queries(queries)}'
+            )
+        return errors
+
+    def check(self):
+        missing = set(self.budgets) - set(self.runs)
+        assert not missing, f'Не измерены действия: {sorted(missing)}'
+        errors = self.errors()
+        assert not errors, '\n\n'.join(errors)
@@ -1,6 +1,7 @@
 import pytest
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.core.management import call_command
 
 User = get_user_model()
 
@@ -85,6 +86,11 @@ class Test00UserRegistration:
         }
         request_type = 'POST'
         response = client.post(self.url_signup, data=valid_data)
+        assert len(mail.outbox) == outbox_before_count, (
+            f'Проверьте, что {request_type} запрос `{self.url_signup}` не '
+            f'отправляет письмо сам, а ставит его в очередь'
+        )
+        call_command('send_emails')
         outbox_after = mail.outbox  # email outbox after user create
 
         assert response.status_code != 404, (
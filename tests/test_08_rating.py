@@ -0,0 +1,233 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews, create_titles
+
+
+class Test08TitleRating:
+
+    def get_title(self, title_id):
+        from reviews.models import Title
+        return Title.objects.get(pk=title_id)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_counters_follow_reviews(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.review_count) == (12, 3), (
+            'Проверьте, что при создании отзыва обновляются счётчики рейтинга произведения'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/',
+            data={'score': 10}
+        )
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.review_count) == (17, 3), (
+            'Проверьте, что при изменении оценки отзыва обновляется сумма оценок произведения'
+        )
+
+        auth_client(moderator).delete(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/'
+        )
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.review_count) == (14, 2), (
+            'Проверьте, что при удалении отзыва обновляются счётчики рейтинга произведения'
+        )
+
+        moderator.delete()
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.review_count) == (10, 1), (
+            'Проверьте, что при каскадном удалении отзывов вместе с автором '
+            'обновляются счётчики рейтинга произведения'
+        )
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') == 10
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_recount_ratings_command(self, admin_client, admin):
+        from reviews.models import Title
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.update(rating_sum=0, review_count=0)
+
+        call_command('recount_ratings')
+
+        title = self.get_title(titles[0]['id'])
+        assert (title.rating_sum, title.review_count) == (12, 3), (
+            'Проверьте, что команда `recount_ratings` пересчитывает рейтинг по отзывам'
+        )
+        title = self.get_title(titles[1]['id'])
+        assert (title.rating_sum, title.review_count) == (0, 0)
+        assert title.rating is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rating_ordering_and_range(self, client, admin_client, admin):
+        from reviews.models import Title
+        _, titles, user, _ = create_reviews(admin_client, admin)
+        Title.objects.create(name='Без отзывов', year=1999)
+        auth_client(user).post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'Супер', 'score': 9}
+        )
+        assert self.get_title(titles[0]['id']).rating == 4
+
+        response = client.get('/api/v1/titles/?ordering=-rating')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Проект', 'Поворот туда', 'Без отзывов'], (
+            'Проверьте, что `?ordering=-rating` сортирует по рейтингу, '
+            'произведения без отзывов — в конце'
+        )
+        response = client.get('/api/v1/titles/?rating_min=5')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Проект'], (
+            'Проверьте, что `?rating_min=` фильтрует по рейтингу'
+        )
+        response = client.get('/api/v1/titles/?rating_min=3&rating_max=4.5')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Поворот туда']
+
+        plan = Title.objects.order_by('-rating')[:10].explain()
+        assert 'reviews_title_rating' in plan, (
+            'Проверьте, что сортировка по рейтингу использует индекс'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_weighted_rating(self, client, admin_client, admin):
+        from reviews.models import Review, Title
+        _, titles, user, moderator = create_reviews(admin_client, admin)
+        auth_client(user).post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'Супер', 'score': 10}
+        )
+        Title.objects.create(name='Без отзывов', year=1999)
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json()['weighted_rating'] is None
+
+        call_command('recount_weighted_ratings', prior_reviews=2)
+
+        # Среднее по каталогу: (5 + 3 + 4 + 10) / 4 = 5.5.
+        assert self.get_title(titles[0]['id']).weighted_rating == (
+            pytest.approx((12 + 2 * 5.5) / 5)
+        ), 'Проверьте формулу взвешенного рейтинга'
+        assert self.get_title(titles[1]['id']).weighted_rating == (
+            pytest.approx((10 + 2 * 5.5) / 3)
+        )
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json()['weighted_rating'] == pytest.approx(7), (
+            'Проверьте, что взвешенный рейтинг есть в ответе и кэш '
+            'ответов сбрасывается после пересчёта'
+        )
+
+        response = client.get('/api/v1/titles/?ordering=-weighted_rating')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Проект', 'Поворот туда', 'Без отзывов'], (
+            'Проверьте, что `?ordering=-weighted_rating` сортирует по '
+            'взвешенному рейтингу'
+        )
+
+        Review.objects.filter(title_id=titles[1]['id']).delete()
+        call_command('recount_weighted_ratings', prior_reviews=2)
+        assert self.get_title(titles[1]['id']).weighted_rating is None, (
+            'Проверьте, что у произведения без отзывов взвешенный рейтинг сброшен'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_score_histogram(self, client, admin_client, admin):
+        from reviews.models import Title
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        expected = [0, 0, 1, 1, 1, 0, 0, 0, 0, 0]
+        assert client.get(url).json().get('score_histogram') == expected, (
+            'Проверьте, что ответ `/api/v1/titles/{title_id}/` содержит '
+            'гистограмму оценок `score_histogram`'
+        )
+
+        admin_client.patch(
+            f'{url}reviews/{reviews[0]["id"]}/', data={'score': 3}
+        )
+        auth_client(moderator).delete(f'{url}reviews/{reviews[2]["id"]}/')
+        expected = [0, 0, 2, 0, 0, 0, 0, 0, 0, 0]
+        title = self.get_title(titles[0]['id'])
+        assert title.score_histogram == expected, (
+            'Проверьте, что гистограмма обновляется при изменении оценки '
+            'и удалении отзыва'
+        )
+        assert (sum(title.score_histogram), title.rating_sum) == (2, 6)
+
+        response = client.get('/api/v1/titles/')
+        assert 'score_histogram' not in response.json()['results'][0], (
+            'Проверьте, что в списке произведений гистограмма выводится '
+            'только по запросу'
+        )
+        response = client.get('/api/v1/titles/?histogram=true')
+        histograms = {
+            title['id']: title['score_histogram']
+            for title in response.json()['results']
+        }
+        assert histograms[titles[0]['id']] == expected
+
+        Title.objects.update(score_3_count=0)
+        call_command('recount_ratings')
+        assert self.get_title(titles[0]['id']).score_histogram == expected, (
+            'Проверьте, что команда `recount_ratings` пересчитывает гистограмму'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_rating_filter_count_follows_reviews(self, client,
+                                                     admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?rating_min=5'
+        assert client.get(url).json()['count'] == 0
+
+        admin_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                          data={'text': 'Отлично', 'score': 9})
+        response = client.get(url).json()
+        assert (response['count'], len(response['results'])) == (1, 1), (
+            'Проверьте, что закэшированное число произведений в фильтре по '
+            'рейтингу сбрасывается после нового отзыва'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_stale_review_instances(self, admin_client, admin):
+        from reviews.models import Review
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        first = Review.objects.get(pk=reviews[0]['id'])
+        stale = Review.objects.get(pk=reviews[0]['id'])
+        first.score = 8
+        first.save()
+        stale.score = 3
+        stale.save()
+        title = self.get_title(title_id)
+        histogram = title.score_histogram
+        assert sum(histogram) == title.review_count == 3, (
+            'Проверьте, что при изменении отзыва из счётчиков вычитается '
+            'оценка из БД, а не загруженная вместе с экземпляром'
+        )
+        scores = list(Review.objects.filter(title_id=title_id).values_list(
+            'score', flat=True
+        ))
+        assert histogram == [scores.count(score) for score in range(1, 11)]
+        assert title.rating_sum == sum(scores)
+
+        stale = Review.objects.get(pk=reviews[1]['id'])
+        Review.objects.get(pk=reviews[1]['id']).delete()
+        assert stale.delete() == (0, {})
+        title = self.get_title(title_id)
+        assert sum(title.score_histogram) == title.review_count == 2, (
+            'Проверьте, что повторное удаление отзыва не сдвигает счётчики'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_08_internal_columns_are_not_filters(self, client, admin_client,
+                                                 admin):
+        create_reviews(admin_client, admin)
+        total = client.get('/api/v1/titles/').json()['count']
+        for query in ('rating_sum=12', 'review_count=0', 'score_3_count=0',
+                      'updated_at=2000-01-01'):
+            response = client.get(f'/api/v1/titles/?{query}')
+            assert response.json()['count'] == total, (
+                'Проверьте, что служебные колонки произведения не доступны '
+                f'как фильтры: `?{query}`'
+            )
+        assert client.get('/api/v1/titles/?year=1900').json()['count'] == 0
@@ -0,0 +1,43 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test09TitleQueries:
+
+    def create_many_titles(self, start, count):
+        from reviews.models import Category, Genre, Title
+        category = Category.objects.get(slug='films')
+        genres = list(Genre.objects.all())
+        for number in range(start, start + count):
+            title = Title.objects.create(
+                name=f'Тайтл {number}', year=1990, category=category
+            )
+            title.genre.set(genres)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_list_query_count(self, client, admin_client,
+                                       django_assert_num_queries):
+        create_titles(admin_client)
+        self.create_many_titles(0, 3)
+        url = '/api/v1/titles/?category=films&genre=comedy&year=1990'
+        # COUNT для пагинации, выборка с категорией, prefetch жанров.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == 3
+
+        self.create_many_titles(3, 20)
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == 10, (
+            'Проверьте, что число запросов к БД для `/api/v1/titles/` '
+            'не зависит от количества произведений на странице'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_query_count(self, client, admin_client,
+                                         django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert len(response.json()['genre']) == 2
@@ -0,0 +1,107 @@
+import base64
+import json
+
+import pytest
+
+from .common import create_titles
+
+
+class Test10TitleCursorPagination:
+
+    def create_many_titles(self, count):
+        from reviews.models import Category, Title
+        category = Category.objects.get(slug='films')
+        for number in range(count):
+            Title.objects.create(
+                name=f'Тайтл {number}', year=1990 + number % 4,
+                category=category
+            )
+
+    def walk(self, client, url, link):
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data
+            pages.append([title['id'] for title in data['results']])
+            url = data[link]
+        return pages
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cursor_pages(self, client, admin_client):
+        from reviews.models import Title
+        create_titles(admin_client)
+        self.create_many_titles(23)
+        expected = list(
+            Title.objects.filter(category__slug='films')
+            .order_by('-year', '-id').values_list('id', flat=True)
+        )
+
+        pages = self.walk(
+            client, '/api/v1/titles/?cursor=&category=films', 'next'
+        )
+        assert [len(page) for page in pages] == [10, 10, 4]
+        assert sum(pages, []) == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/?cursor=` '
+            'отдаёт все произведения по порядку (-year, -id) без повторов '
+            'и с учётом фильтров'
+        )
+
+        last_page = client.get(
+            '/api/v1/titles/?cursor=&category=films'
+        ).json()['next']
+        last_page = client.get(last_page).json()['next']
+        back = self.walk(
+            client, client.get(last_page).json()['previous'], 'previous'
+        )
+        assert back == pages[:-1][::-1]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_page_number_still_works(self, client, admin_client):
+        create_titles(admin_client)
+        self.create_many_titles(12)
+        response = client.get('/api/v1/titles/?page=2')
+        data = response.json()
+        assert data['count'] == 14
+        assert len(data['results']) == 4
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_invalid_cursor(self, client):
+        response = client.get('/api/v1/titles/?cursor=bad')
+        assert response.status_code == 404
+        for position in (['abc', 'x'], ['2000', str(2 ** 70)]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps({'r': False, 'p': position}).encode()
+            ).decode()
+            response = client.get(f'/api/v1/titles/?cursor={cursor}')
+            assert response.status_code == 404, (
+                'Проверьте, что курсор с подставленными значениями '
+                'отклоняется ответом 404'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_cursor_follows_ordering(self, client, admin_client):
+        from reviews.models import Title
+        create_titles(admin_client)
+        self.create_many_titles(23)
+        for ordering in ('name', '-year', 'year'):
+            expected = list(Title.objects.order_by(
+                ordering, '-id'
+            ).values_list('id', flat=True))
+            pages = self.walk(
+                client, f'/api/v1/titles/?cursor=&ordering={ordering}',
+                'next'
+            )
+            assert sum(pages, []) == expected, (
+                'Проверьте, что курсор `/api/v1/titles/?cursor=` идёт по '
+                'сортировке из `?ordering=`'
+            )
+
+        for query in ('ordering=-rating', 'search=Тайтл'):
+            response = client.get(f'/api/v1/titles/?cursor=&{query}')
+            assert response.status_code == 400, (
+                'Проверьте, что курсор отклоняет сортировку, которую не '
+                'может продолжить: по релевантности и по рейтингу с NULL'
+            )
+            assert 'cursor' in response.json()
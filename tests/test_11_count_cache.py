@@ -0,0 +1,98 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews, create_titles
+
+
+class Test11CountCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_count_is_cached_and_invalidated(self, client, admin_client,
+                                                admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        assert response.json()['count'] == 3
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert not any('COUNT' in query['sql'] for query in context)
+        assert response.json()['count'] == 3, (
+            'Проверьте, что повторный запрос списка берёт `count` из кэша'
+        )
+
+        admin_client.delete(f'{url}{reviews[1]["id"]}/')
+        response = client.get(url)
+        assert response.json()['count'] == 2, (
+            'Проверьте, что запись в таблицу сбрасывает закэшированный `count`'
+        )
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/reviews/')
+        assert response.json()['count'] == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_count_follows_genre_changes(self, client,
+                                                  admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/?genre=drama')
+        assert response.json()['count'] == 1
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/', data={'genre': ['drama']}
+        )
+        response = client.get('/api/v1/titles/?genre=drama')
+        assert response.json()['count'] == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_count_false(self, client, admin_client,
+                            django_assert_num_queries):
+        from reviews.models import Genre
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(12)
+        )
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/genres/?count=false')
+        data = response.json()
+        assert data['count'] is None
+        assert len(data['results']) == 10
+        assert data['previous'] is None
+        assert 'page=2' in data['next']
+
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 2
+        assert data['next'] is None
+        assert 'page' not in data['previous']
+        assert 'count=false' in data['previous']
+
+        response = client.get('/api/v1/genres/?count=false&page=3')
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_stale_count_does_not_cut_pages(self):
+        from api.v1.caching import get_cache
+        from api.v1.pagination import CachedCountPaginator
+        from reviews.models import Genre
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(15)
+        )
+        get_cache().set('stale-count', 5)
+        paginator = CachedCountPaginator(
+            Genre.objects.order_by('pk'), 10,
+            cache_key='stale-count', timeout=60
+        )
+        page = paginator.page(1)
+        assert paginator.count == 5
+        assert len(page) == 10 and page.has_next(), (
+            'Проверьте, что закэшированный `count` не определяет, какие '
+            'записи и ссылки попадут на страницу'
+        )
+        page = paginator.page(2)
+        assert len(page) == 5 and not page.has_next()
+
+        get_cache().set('stale-count', 40)
+        paginator = CachedCountPaginator(
+            Genre.objects.order_by('pk'), 10,
+            cache_key='stale-count', timeout=60
+        )
+        assert not paginator.page(2).has_next()
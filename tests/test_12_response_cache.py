@@ -0,0 +1,69 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test12ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_responses_are_cached(self, client, admin_client,
+                                           django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        client.get('/api/v1/titles/?year=2000')
+        client.get(url)
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/?year=2000')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что повторный GET `/api/v1/titles/` отдаётся из кэша'
+        )
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.json()['name'] == titles[0]['name']
+
+        admin_client.patch(url, data={'name': 'Новое название'})
+        response = client.get(url)
+        assert response.json()['name'] == 'Новое название', (
+            'Проверьте, что изменение произведения сбрасывает кэш ответов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_invalidate_title_rating(self, client, admin_client,
+                                                admin):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        admin_client.post(
+            f'{url}reviews/', data={'text': 'Отлично', 'score': 9}
+        )
+        assert client.get(url).json()['rating'] == 9, (
+            'Проверьте, что новый отзыв сбрасывает закэшированный рейтинг'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_invalidation_is_precise(self, client, admin_client,
+                                        django_assert_num_queries):
+        create_titles(admin_client)
+        client.get('/api/v1/genres/')
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'}
+        )
+        with django_assert_num_queries(0):
+            client.get('/api/v1/genres/')
+        admin_client.delete('/api/v1/genres/comedy/')
+        response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_shared_file_cache(self, client, admin_client, settings,
+                                  tmp_path, django_assert_num_queries):
+        settings.CACHES = {
+            **settings.CACHES,
+            'file': {**settings.CACHES['file'], 'LOCATION': str(tmp_path)},
+        }
+        settings.API_CACHE_ALIAS = 'file'
+        create_titles(admin_client)
+        client.get('/api/v1/categories/')
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 2
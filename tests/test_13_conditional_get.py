@@ -0,0 +1,112 @@
+import pytest
+
+from .common import create_comments, create_reviews
+
+
+class Test13ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_not_modified(self, client, admin_client, admin,
+                                     django_assert_num_queries):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and response['Last-Modified'], (
+            'Проверьте, что GET `/api/v1/titles/{title_id}/reviews/` '
+            'возвращает заголовки `ETag` и `Last-Modified`'
+        )
+
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается 304 '
+            'без обращений к БД'
+        )
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == 304
+
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        other_etag = client.get(other_url)['ETag']
+        admin_client.patch(f'{url}{reviews[0]["id"]}/', data={'score': 1})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение отзыва меняет `ETag` списка отзывов'
+        )
+        assert response['ETag'] != etag
+        response = client.get(other_url, HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == 304, (
+            'Проверьте, что изменение отзыва не сбрасывает `ETag` '
+            'отзывов другого произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comments_and_titles(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        admin_client.delete(f'{url}{comments[0]["id"]}/')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        admin_client.delete(f'{url}reviews/{reviews[1]["id"]}/')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что удаление отзыва меняет `ETag` произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_authors_in_etags(self, client, admin_client, admin):
+        _, reviews, titles, user, _ = create_comments(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        urls = (reviews_url, f'{reviews_url}{reviews[0]["id"]}/comments/')
+        etags = [client.get(url)['ETag'] for url in urls]
+
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'newcomer', 'email': 'newcomer@yamdb.fake'
+        })
+        assert response.status_code == 200
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                'Проверьте, что регистрация пользователя не сбрасывает `ETag` '
+                'отзывов и комментариев'
+            )
+
+        response = admin_client.patch(f'/api/v1/users/{user.username}/',
+                                      data={'username': 'renamed'})
+        assert response.status_code == 200
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200, (
+                'Проверьте, что смена имени автора меняет `ETag` его отзывов '
+                'и комментариев'
+            )
+            assert 'renamed' in {item['author']
+                                 for item in response.json()['results']}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_change_in_the_same_second(self, client, admin_client, admin,
+                                          monkeypatch):
+        from types import SimpleNamespace
+
+        from api.v1 import caching
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        # Две записи и чтение между ними в одну и ту же секунду.
+        monkeypatch.setattr(caching, 'time',
+                            SimpleNamespace(time=lambda: 2_000_000_000.25))
+        admin_client.patch(f'{url}{reviews[0]["id"]}/', data={'score': 2})
+        last_modified = client.get(url)['Last-Modified']
+        admin_client.patch(f'{url}{reviews[0]["id"]}/', data={'score': 1})
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200, (
+            'Проверьте, что запись в ту же секунду, что и чтение, меняет '
+            '`Last-Modified`'
+        )
+        assert response['Last-Modified'] != last_modified
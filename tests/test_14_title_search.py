@@ -0,0 +1,48 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test14TitleSearch:
+
+    def search(self, client, text):
+        response = client.get('/api/v1/titles/', {'search': text})
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_cyrillic_prefix(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.search(client, 'ПОВОРОТ') == ['Поворот туда'], (
+            'Проверьте, что поиск `?search=` не зависит от регистра '
+            'для кириллицы'
+        )
+        assert self.search(client, 'пово') == ['Поворот туда'], (
+            'Проверьте, что поиск `?search=` находит слова по префиксу'
+        )
+        assert self.search(client, 'драма') == ['Проект'], (
+            'Проверьте, что поиск `?search=` ищет и по описанию'
+        )
+        assert self.search(client, 'драма "') == ['Проект']
+        assert len(self.search(client, '')) == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_ranking(self, client, admin_client):
+        from reviews.models import Title
+        Title.objects.create(
+            name='Обычный фильм', year=2001, description='Про космос'
+        )
+        Title.objects.create(name='Космос', year=1990, description='')
+        assert self.search(client, 'космос') == ['Космос', 'Обычный фильм'], (
+            'Проверьте, что совпадение в названии ранжируется выше'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Разворот'})
+        assert self.search(client, 'разворот') == ['Разворот']
+        assert self.search(client, 'поворот') == []
+        admin_client.delete(url)
+        assert self.search(client, 'разворот') == []
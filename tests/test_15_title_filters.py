@@ -0,0 +1,47 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test15TitleFilters:
+
+    def names(self, client, query):
+        response = client.get(f'/api/v1/titles/?{query}')
+        assert response.status_code == 200
+        return sorted(title['name'] for title in response.json()['results'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_multiple_genres(self, client, admin_client):
+        create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Смех', 'year': 2010, 'genre': ['comedy', 'drama'],
+            'category': 'films'
+        })
+        assert self.names(client, 'genre=horror,drama') == [
+            'Поворот туда', 'Проект', 'Смех'
+        ], (
+            'Проверьте, что `?genre=a,b` отдаёт произведения любого из жанров'
+        )
+        assert self.names(client, 'genre=comedy,drama&genre_mode=all') == [
+            'Смех'
+        ], (
+            'Проверьте, что `?genre=a,b&genre_mode=all` отдаёт произведения '
+            'со всеми указанными жанрами'
+        )
+        assert self.names(
+            client, 'genre=comedy,horror,comedy&genre_mode=all'
+        ) == ['Поворот туда']
+        assert self.names(client, 'genre=com') == [], (
+            'Проверьте, что жанр фильтруется по точному совпадению слага'
+        )
+        response = client.get('/api/v1/titles/?genre=drama&genre_mode=some')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_multiple_categories(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, 'category=films,books') == [
+            'Поворот туда', 'Проект'
+        ]
+        assert self.names(client, 'category=books') == ['Проект']
+        assert self.names(client, 'category=book') == []
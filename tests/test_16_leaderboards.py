@@ -0,0 +1,96 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_reviews
+
+
+class Test16Leaderboards:
+
+    def names(self, client, kind, slug):
+        response = client.get(f'/api/v1/leaderboards/{kind}/{slug}/')
+        assert response.status_code == 200
+        return [(title['name'], title['rating']) for title in response.json()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_leaderboards_follow_reviews(self, client, admin_client,
+                                            admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        assert self.names(client, 'category', 'films') == [
+            ('Поворот туда', 4)
+        ], 'Проверьте, что отзыв добавляет произведение в топ категории'
+        assert self.names(client, 'genre', 'comedy') == [('Поворот туда', 4)]
+        assert self.names(client, 'category', 'books') == [], (
+            'Проверьте, что произведения без оценок в топ не попадают'
+        )
+
+        auth_client(user).post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'Супер', 'score': 9}
+        )
+        assert self.names(client, 'genre', 'drama') == [('Проект', 9)]
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/',
+            data={'score': 10}
+        )
+        assert self.names(client, 'genre', 'horror') == [
+            ('Поворот туда', 5)
+        ], 'Проверьте, что изменение оценки обновляет рейтинг в топе'
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            data={'category': 'films', 'genre': ['horror']}
+        )
+        assert self.names(client, 'category', 'films') == [
+            ('Проект', 9), ('Поворот туда', 5)
+        ], 'Проверьте, что смена категории переносит произведение в другой топ'
+        assert self.names(client, 'genre', 'horror') == [
+            ('Проект', 9), ('Поворот туда', 5)
+        ]
+        assert self.names(client, 'genre', 'drama') == []
+        assert self.names(client, 'category', 'books') == []
+
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert self.names(client, 'category', 'films') == [
+            ('Поворот туда', 5)
+        ], 'Проверьте, что удалённое произведение пропадает из топа'
+
+        admin_client.delete('/api/v1/genres/comedy/')
+        assert self.names(client, 'genre', 'comedy') == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_command_and_single_query(self, client, admin_client,
+                                                 admin):
+        from reviews.models import LeaderboardEntry
+        create_reviews(admin_client, admin)
+        LeaderboardEntry.objects.all().delete()
+
+        call_command('rebuild_leaderboards')
+
+        assert LeaderboardEntry.objects.count() == 3, (
+            'Проверьте, что команда `rebuild_leaderboards` пересобирает топы '
+            'по категориям и жанрам'
+        )
+        with CaptureQueriesContext(connection) as context:
+            assert self.names(client, 'genre', 'horror') == [
+                ('Поворот туда', 4)
+            ]
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что топ читается одним запросом'
+        )
+        plan = LeaderboardEntry.objects.filter(
+            genre__slug='horror'
+        ).order_by('-rating', 'title').explain()
+        assert 'leaderboard_genre_idx' in plan, (
+            'Проверьте, что топ читается по индексу'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_unknown_leaderboard(self, client):
+        response = client.get('/api/v1/leaderboards/genre/unknown/')
+        assert response.status_code == 200
+        assert response.json() == []
+        response = client.get('/api/v1/leaderboards/author/unknown/')
+        assert response.status_code == 404
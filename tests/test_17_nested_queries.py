@@ -0,0 +1,86 @@
+import pytest
+
+from .common import auth_client, create_comments
+
+
+class Test17NestedQueries:
+
+    def add_reviews(self, title_id, review_id, count):
+        from django.contrib.auth import get_user_model
+        from reviews.models import Comments, Review
+        for number in range(count):
+            author = get_user_model().objects.create(
+                username=f'reader{title_id}_{review_id}_{number}',
+                email=f'reader{title_id}_{review_id}_{number}@yamdb.fake'
+            )
+            Review.objects.create(title_id=title_id, author=author,
+                                  text='Отзыв', score=7)
+            Comments.objects.create(review_id=review_id, author=author,
+                                    text='Комментарий')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_review_list_query_count(self, client, admin_client, admin,
+                                        django_assert_num_queries):
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        # Проверка произведения, COUNT для пагинации, выборка с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == 3
+
+        self.add_reviews(titles[0]['id'], reviews[0]['id'], 12)
+        with django_assert_num_queries(3):
+            response = client.get(f'{url}?page=2')
+        assert len(response.json()['results']) == 5, (
+            'Проверьте, что число запросов к БД для списка отзывов '
+            'не зависит от количества отзывов на странице'
+        )
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}{reviews[1]["id"]}/')
+        assert response.json()['author'] == user.username
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comment_list_query_count(self, client, admin_client, admin,
+                                         django_assert_num_queries):
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        self.add_reviews(titles[1]['id'], reviews[0]['id'], 12)
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == 10, (
+            'Проверьте, что число запросов к БД для списка комментариев '
+            'не зависит от количества комментариев на странице'
+        )
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}{comments[1]["id"]}/')
+        assert response.json()['author'] == user.username
+
+        # Пользователь из токена, проверка отзыва, INSERT.
+        with django_assert_num_queries(3):
+            response = auth_client(user).post(url, data={'text': 'Ещё'})
+        assert response.status_code == 201
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_missing_parent(self, client, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(
+            admin_client, admin
+        )
+        assert client.get('/api/v1/titles/999/reviews/').status_code == 404
+        url = (f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что комментарии отзыва не отдаются по адресу '
+            'другого произведения'
+        )
+        assert client.get(f'{url}{comments[0]["id"]}/').status_code == 404
+        response = auth_client(user).post(url, data={'text': 'Ещё'})
+        assert response.status_code == 404
+        response = auth_client(user).post(
+            '/api/v1/titles/999/reviews/', data={'text': 'Ещё', 'score': 5}
+        )
+        assert response.status_code == 404
@@ -0,0 +1,155 @@
+import pytest
+
+from .query_budget import QueryBudget
+
+SIZES = (1, 12, 30)
+
+# Бюджет SQL-запросов на одно действие при пустом кэше ответов.
+BUDGETS = {
+    'genres-list': 2,
+    'categories-list': 2,
+    'title-list': 3,
+    'title-list-histogram': 3,
+    'title-detail': 2,
+    'title-create': 13,
+    'title-partial_update': 16,
+    'title-destroy': 9,
+    'leaderboards-list': 1,
+    'reviews-list': 3,
+    'reviews-detail': 1,
+    'reviews-create': 8,
+    'reviews-partial_update': 8,
+    'reviews-destroy': 9,
+    'comments-list': 3,
+    'comments-detail': 1,
+    'user-list': 3,
+    'user-detail': 2,
+    'user-me': 1,
+    'auth-signup': 3,
+    'auth-token': 1,
+}
+
+
+class Test18QueryBudget:
+
+    def seed(self, start, count):
+        """
+        Добавляет по count произведений, пользователей, отзывов к первому
+        произведению и комментариев к первому отзыву.
+        """
+        from django.contrib.auth import get_user_model
+        from reviews.models import Category, Comments, Genre, Review, Title
+        category, _ = Category.objects.get_or_create(slug='films',
+                                                     name='Фильмы')
+        genres = [
+            Genre.objects.get_or_create(slug=slug, name=slug)[0]
+            for slug in ('comedy', 'drama')
+        ]
+        first_title, created = Title.objects.get_or_create(
+            name='Основной', year=2000, category=category
+        )
+        if created:
+            first_title.genre.set(genres)
+        for number in range(start, start + count):
+            title = Title.objects.create(name=f'Тайтл {number}', year=2000,
+                                         category=category)
+            title.genre.set(genres)
+            author = get_user_model().objects.create(
+                username=f'reader{number}', email=f'reader{number}@yamdb.fake'
+            )
+            Review.objects.create(title=first_title, author=author,
+                                  text='Отзыв', score=number % 10 + 1)
+            Review.objects.create(title=title, author=author,
+                                  text='Отзыв', score=8)
+            Comments.objects.create(
+                review=first_title.reviews.order_by('id').first(),
+                author=author, text='Комментарий'
+            )
+        return first_title, first_title.reviews.order_by('id').first()
+
+    def requests(self, client, admin_client, admin, size, title, review):
+        from django.contrib.auth import get_user_model
+        from django.contrib.auth.tokens import default_token_generator
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        comment = review.comments.order_by('id').first()
+        author = review.author.username
+        signup = {'username': f'newcomer{size}',
+                  'email': f'newcomer{size}@yamdb.fake'}
+        yield 'genres-list', lambda: client.get('/api/v1/genres/')
+        yield 'categories-list', lambda: client.get('/api/v1/categories/')
+        yield 'title-list', lambda: client.get('/api/v1/titles/')
+        yield 'title-list-histogram', lambda: client.get(
+            '/api/v1/titles/?histogram=true&genre=comedy&ordering=-rating'
+        )
+        yield 'title-detail', lambda: client.get(f'/api/v1/titles/{title.id}/')
+        response = yield 'title-create', lambda: admin_client.post(
+            '/api/v1/titles/', data={
+                'name': f'Новый {size}', 'year': 2000, 'category': 'films',
+                'genre': ['comedy', 'drama']
+            }
+        )
+        new_title_url = f'/api/v1/titles/{response.json()["id"]}/'
+        yield 'title-partial_update', lambda: admin_client.patch(
+            new_title_url, data={'genre': ['drama'], 'year': 2001}
+        )
+        yield 'title-destroy', lambda: admin_client.delete(new_title_url)
+        yield 'leaderboards-list', lambda: client.get(
+            '/api/v1/leaderboards/genre/comedy/'
+        )
+        yield 'reviews-list', lambda: client.get(reviews_url)
+        yield 'reviews-detail', lambda: client.get(
+            f'{reviews_url}{review.id}/'
+        )
+        response = yield 'reviews-create', lambda: admin_client.post(
+            reviews_url, data={'text': 'Отзыв', 'score': 5}
+        )
+        own_review_url = f'{reviews_url}{response.json()["id"]}/'
+        yield 'reviews-partial_update', lambda: admin_client.patch(
+            own_review_url, data={'score': 9}
+        )
+        yield 'reviews-destroy', lambda: admin_client.delete(own_review_url)
+        yield 'comments-list', lambda: client.get(comments_url)
+        yield 'comments-detail', lambda: client.get(
+            f'{comments_url}{comment.id}/'
+        )
+        yield 'user-list', lambda: admin_client.get('/api/v1/users/')
+        yield 'user-detail', lambda: admin_client.get(
+            f'/api/v1/users/{author}/'
+        )
+        yield 'user-me', lambda: admin_client.get('/api/v1/users/me/')
+        yield 'auth-signup', lambda: client.post('/api/v1/auth/signup/',
+                                                 data=signup)
+        user = get_user_model().objects.get(username=signup['username'])
+        token = {'username': user.username,
+                 'confirmation_code': default_token_generator.make_token(user)}
+        yield 'auth-token', lambda: client.post('/api/v1/auth/token/',
+                                                data=token)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_every_route_has_a_budget(self):
+        from api.v1.urls import v1_router
+        measured = {name.rsplit('-', 1)[0] for name in BUDGETS}
+        routes = {basename for _, _, basename in v1_router.registry}
+        assert routes <= measured, (
+            'Добавьте в BUDGETS действия для маршрутов '
+            f'{sorted(routes - measured)}'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_query_counts_do_not_grow(self, client, admin_client, admin):
+        budget = QueryBudget(BUDGETS)
+        seeded = 0
+        for size in SIZES:
+            title, review = self.seed(seeded, size - seeded)
+            seeded = size
+            requests = self.requests(client, admin_client, admin, size,
+                                     title, review)
+            response = None
+            while True:
+                try:
+                    name, request = requests.send(response)
+                except StopIteration:
+                    break
+                response = budget.measure(name, size, request)
+        budget.check()
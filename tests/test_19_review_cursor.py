@@ -0,0 +1,87 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from .common import create_comments
+
+
+class Test19ReviewCursorPagination:
+
+    def create_many(self, review, count):
+        """Отзывы и комментарии, у части которых совпадает pub_date."""
+        from django.contrib.auth import get_user_model
+        from reviews.models import Comments, Review
+        for number in range(count):
+            author = get_user_model().objects.create(
+                username=f'reader{number}', email=f'reader{number}@yamdb.fake'
+            )
+            Review.objects.create(title_id=review.title_id, author=author,
+                                  text='Отзыв', score=5)
+            Comments.objects.create(review=review, author=author,
+                                    text='Комментарий')
+        now = timezone.now()
+        for model in (Review, Comments):
+            for obj in model.objects.all():
+                model.objects.filter(pk=obj.pk).update(
+                    pub_date=now - datetime.timedelta(minutes=obj.pk % 4)
+                )
+
+    def walk(self, client, url, link):
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            pages.append([obj['id'] for obj in data['results']])
+            url = data[link]
+        return pages
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_review_and_comment_cursor(self, client, admin_client, admin):
+        from reviews.models import Comments, Review
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        review = Review.objects.get(pk=reviews[0]['id'])
+        self.create_many(review, 20)
+        cases = (
+            (f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+             Review.objects.filter(title_id=titles[0]['id'])),
+            (f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.id}/'
+             'comments/', Comments.objects.filter(review=review)),
+        )
+        for url, queryset in cases:
+            expected = list(queryset.order_by(
+                '-pub_date', '-id'
+            ).values_list('id', flat=True))
+            pages = self.walk(client, f'{url}?cursor=', 'next')
+            assert sum(pages, []) == expected, (
+                f'Проверьте, что курсорная пагинация `{url}?cursor=` отдаёт '
+                'все записи от новых к старым без повторов'
+            )
+            back = self.walk(
+                client, client.get(
+                    client.get(f'{url}?cursor=').json()['next']
+                ).json()['previous'], 'previous'
+            )
+            assert back == pages[:1]
+
+            response = client.get(url)
+            assert [obj['id'] for obj in response.json()['results']] == (
+                expected[:10]
+            ), f'Проверьте, что `{url}` отдаёт новые записи первыми'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_pub_date_indexes(self):
+        from reviews.models import Comments, Review
+        plan = Review.objects.filter(title_id=1).order_by(
+            '-pub_date', '-id'
+        )[:10].explain()
+        assert 'review_title_pub_date_idx' in plan
+        assert 'TEMP B-TREE' not in plan, (
+            'Проверьте, что отзывы сортируются по индексу без доп. сортировки'
+        )
+        plan = Comments.objects.filter(review_id=1).order_by(
+            '-pub_date', '-id'
+        )[:10].explain()
+        assert 'comment_review_pub_date_idx' in plan
+        assert 'TEMP B-TREE' not in plan
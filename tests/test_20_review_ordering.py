@@ -0,0 +1,68 @@
+import pytest
+
+from .common import create_reviews
+
+
+class Test20ReviewOrdering:
+
+    def create_many_reviews(self, title_id, count):
+        from django.contrib.auth import get_user_model
+        from reviews.models import Review
+        for number in range(count):
+            author = get_user_model().objects.create(
+                username=f'reader{number}', email=f'reader{number}@yamdb.fake'
+            )
+            Review.objects.create(title_id=title_id, author=author,
+                                  text='Отзыв', score=number % 10 + 1)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_ordering_and_score_range(self, client, admin_client, admin):
+        from reviews.models import Review
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = client.get(f'{url}?ordering=-score')
+        scores = [review['score'] for review in response.json()['results']]
+        assert scores == [5, 4, 3], (
+            'Проверьте, что `?ordering=-score` сортирует отзывы по оценке'
+        )
+        response = client.get(f'{url}?ordering=score')
+        scores = [review['score'] for review in response.json()['results']]
+        assert scores == [3, 4, 5]
+
+        response = client.get(f'{url}?score_min=4')
+        scores = {review['score'] for review in response.json()['results']}
+        assert scores == {4, 5}, (
+            'Проверьте, что `?score_min=` фильтрует отзывы по оценке'
+        )
+        response = client.get(f'{url}?score_min=4&score_max=4')
+        assert [r['score'] for r in response.json()['results']] == [4]
+
+        self.create_many_reviews(titles[0]['id'], 25)
+        expected = list(Review.objects.filter(
+            title_id=titles[0]['id'], score__gte=3
+        ).order_by('-score', '-pub_date', '-id').values_list('id', flat=True))
+        pages = []
+        next_url = f'{url}?cursor=&ordering=-score&score_min=3'
+        while next_url:
+            data = client.get(next_url).json()
+            pages.append([review['id'] for review in data['results']])
+            next_url = data['next']
+        assert sum(pages, []) == expected, (
+            'Проверьте, что курсорная пагинация учитывает `?ordering=-score`'
+        )
+        response = client.get(f'{url}?ordering=-score&page=2')
+        assert [r['id'] for r in response.json()['results']] == (
+            expected[10:20]
+        ), 'Проверьте, что порядок отзывов с равной оценкой однозначен'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_score_index(self):
+        from reviews.models import Review
+        plan = Review.objects.filter(title_id=1, score__gte=8).order_by(
+            '-score', '-pub_date', '-id'
+        )[:10].explain()
+        assert 'review_title_score_idx' in plan
+        assert 'TEMP B-TREE' not in plan, (
+            'Проверьте, что отзывы сортируются по оценке по индексу'
+        )
@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews
+
+
+class Test21SparseFieldsets:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, response.content
+        return response.json(), [query['sql'] for query in context]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_fields(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        data, queries = self.get(client, '/api/v1/titles/?fields=id,name')
+        assert set(data['results'][0]) == {'id', 'name'}, (
+            'Проверьте, что `?fields=` оставляет в ответе только '
+            'перечисленные поля'
+        )
+        select = queries[-1]
+        assert '"description"' not in select, (
+            'Проверьте, что невыводимые текстовые поля не читаются из БД'
+        )
+        assert 'reviews_category' not in select
+        assert not any('reviews_genre' in sql for sql in queries), (
+            'Проверьте, что невыводимые связи не подгружаются'
+        )
+
+        data, queries = self.get(
+            client, f'/api/v1/titles/{titles[0]["id"]}/?omit=description'
+        )
+        assert 'description' not in data
+        assert data['genre'][0].keys() == {'name', 'slug'}, (
+            'Проверьте, что `?fields=`/`?omit=` не обрезают вложенные объекты'
+        )
+        assert '"description"' not in queries[0]
+
+        data, _ = self.get(
+            client, '/api/v1/titles/?fields=name,score_histogram'
+        )
+        assert set(data['results'][0]) == {'name', 'score_histogram'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_text_preview(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data, queries = self.get(client, f'{url}?text_preview=4')
+        assert {review['text'] for review in data['results']} == {'qwer'}, (
+            'Проверьте, что `?text_preview=N` обрезает текст отзыва'
+        )
+        # Текст встречается в SQL только внутри SUBSTR.
+        assert queries[-1].count('"reviews_review"."text"') == 1
+        assert 'SUBSTR("reviews_review"."text"' in queries[-1]
+
+        data, queries = self.get(client, f'{url}?omit=text,author')
+        assert set(data['results'][0]) == {'id', 'score', 'pub_date'}
+        assert '"reviews_review"."text"' not in queries[-1]
+        assert 'users_user' not in queries[-1]
+
+        response = client.get(f'{url}?text_preview=abc')
+        assert response.status_code == 400
+
+        response = client.get('/api/v1/genres/?fields=slug')
+        assert response.json()['results'][0].keys() == {'slug'}
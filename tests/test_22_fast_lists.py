@@ -0,0 +1,69 @@
+import pytest
+
+from .common import create_comments
+
+
+class Test22FastListSerialization:
+
+    def urls(self, titles, reviews):
+        title_id = titles[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        return (
+            '/api/v1/genres/',
+            '/api/v1/categories/?search=Фильм',
+            '/api/v1/titles/',
+            '/api/v1/titles/?ordering=-rating&fields=id,name,rating,genre',
+            '/api/v1/titles/?omit=category,description&genre=comedy',
+            '/api/v1/titles/?search=поворот',
+            reviews_url,
+            f'{reviews_url}?ordering=-score&text_preview=3',
+            f'{reviews_url}?fields=id,author&score_min=4',
+            f'{reviews_url}{reviews[0]["id"]}/comments/',
+            f'{reviews_url}{reviews[0]["id"]}/comments/?omit=pub_date',
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_fast_path_matches_serializers(self, client, admin_client,
+                                              admin, settings, monkeypatch):
+        from api.v1.caching import get_cache
+        from api.v1.fastpath import RowPlan
+        from reviews.models import Title
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        Title.objects.create(name='Без категории', year=1999,
+                             description='Ёжик «в тумане»')
+
+        rendered = []
+        render = RowPlan.render
+
+        def spy(plan, rows):
+            rendered.append(plan)
+            return render(plan, rows)
+        monkeypatch.setattr(RowPlan, 'render', spy)
+
+        for url in self.urls(titles, reviews):
+            get_cache().clear()
+            settings.FAST_LIST_SERIALIZATION = False
+            expected = client.get(url)
+            assert not rendered
+            get_cache().clear()
+            settings.FAST_LIST_SERIALIZATION = True
+            response = client.get(url)
+            assert rendered, f'Проверьте, что `{url}` идёт по быстрому пути'
+            rendered.clear()
+            assert expected.status_code == response.status_code == 200
+            assert response.content == expected.content, (
+                f'Проверьте, что быстрый путь для `{url}` отдаёт тот же ответ'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_unsupported_fields_fall_back(self, client, admin_client,
+                                             admin, django_assert_num_queries):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        response = client.get('/api/v1/titles/?histogram=true')
+        assert 'score_histogram' in response.json()['results'][0]
+        response = client.get('/api/v1/titles/?cursor=')
+        assert len(response.json()['results']) == 2
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        # Проверка произведения, COUNT, выборка отзывов с авторами.
+        with django_assert_num_queries(3):
+            client.get(url)
@@ -0,0 +1,78 @@
+import datetime
+import decimal
+from collections import OrderedDict
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from .common import create_reviews
+
+DATA = [
+    None,
+    [],
+    {},
+    'Ёжик в тумане',
+    OrderedDict([
+        ('count', 250),
+        ('next', None),
+        ('results', [
+            {'id': number, 'name': f'Тайтл «{number}»', 'rating': 7.25,
+             'description': 'строка с разделителем \u2028',
+             'genre': [{'name': 'Драма', 'slug': 'drama'}],
+             'pub_date': datetime.datetime(2021, 5, 1, 12, 30),
+             'price': decimal.Decimal('1.50')}
+            for number in range(250)
+        ]),
+    ]),
+    [{'id': 1, 'tags': ['а', 'б']}, {'id': 2, 'tags': []}],
+]
+
+
+class Test23JSONRenderer:
+
+    @pytest.mark.parametrize('data', DATA)
+    def test_01_same_bytes_as_drf(self, data):
+        from api.v1.renderers import StreamingJSONRenderer
+        renderer = StreamingJSONRenderer()
+        expected = JSONRenderer().render(data, 'application/json')
+        assert renderer.render(data, 'application/json') == expected
+        chunks = list(renderer.iter_render(data, 'application/json'))
+        assert b''.join(chunks) == expected, (
+            'Проверьте, что потоковый вывод совпадает с JSONRenderer'
+        )
+        indented = 'application/json; indent=4'
+        assert renderer.render(data, indented) == JSONRenderer().render(
+            data, indented
+        )
+
+    def test_02_large_lists_are_chunked(self):
+        from api.v1.renderers import StreamingJSONRenderer
+        chunks = list(StreamingJSONRenderer().iter_render(DATA[4]))
+        items = [chunk for chunk in chunks if 'Тайтл'.encode() in chunk]
+        assert len(items) == 3, (
+            'Проверьте, что длинный список отдаётся несколькими частями'
+        )
+        assert b'\\u2028' in items[0]
+        assert 'Тайтл'.encode() in items[0], (
+            'Проверьте, что кириллица выводится без \\u-экранирования'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_streaming_response(self, client, admin_client, admin,
+                                   settings):
+        create_reviews(admin_client, admin)
+        expected = client.get('/api/v1/titles/')
+        assert not expected.streaming
+
+        settings.STREAMING_RESPONSE_MIN_ITEMS = 2
+        response = client.get('/api/v1/titles/')
+        assert response.streaming, (
+            'Проверьте, что большие страницы отдаются через '
+            'StreamingHttpResponse'
+        )
+        assert b''.join(response.streaming_content) == expected.content
+        assert response['Content-Type'] == 'application/json'
+        assert response['ETag'] == expected['ETag']
+
+        response = client.get('/api/v1/genres/?format=api')
+        assert not response.streaming
@@ -0,0 +1,159 @@
+import json
+
+import pytest
+
+from .common import create_comments
+
+
+class Test24Export:
+    url = '/api/v1/export/'
+
+    def parse(self, response):
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        content = b''.join(response.streaming_content).decode()
+        assert not content or content.endswith('\n')
+        return [json.loads(line) for line in content.splitlines()]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_admin_only(self, client, user_client, moderator_client):
+        assert client.get(self.url).status_code == 401
+        assert user_client.get(self.url).status_code == 403
+        assert moderator_client.get(self.url).status_code == 403, (
+            'Проверьте, что выгрузка `/api/v1/export/` доступна только '
+            'администратору'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_all(self, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        response = admin_client.get(self.url)
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоком'
+        )
+        assert response['X-Export-Timestamp']
+        records = self.parse(response)
+        kinds = [record['type'] for record in records]
+        assert kinds == (['title'] * len(titles) + ['review'] * len(reviews)
+                         + ['comment'] * len(comments)), (
+            'Проверьте, что выгрузка содержит все произведения, отзывы и '
+            'комментарии по одной записи на строку'
+        )
+        title = next(
+            record['data'] for record in records
+            if record['type'] == 'title'
+            and record['data']['id'] == titles[0]['id']
+        )
+        assert title['rating'] == 4
+        assert {genre['slug'] for genre in title['genre']} == set(
+            titles[0]['genre']
+        )
+        assert title['updated_at']
+        review = next(
+            record['data'] for record in records
+            if record['type'] == 'review'
+        )
+        assert review['title'] in {title['id'] for title in titles}
+        assert isinstance(review['author'], str)
+        comment = next(
+            record['data'] for record in records
+            if record['type'] == 'comment'
+        )
+        assert comment['review'] == reviews[0]['id']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_resources_and_chunks(self, admin_client, admin, settings):
+        from reviews.models import Title
+        create_comments(admin_client, admin)
+        for year in range(1990, 2000):
+            Title.objects.create(name=f'Фильм {year}', year=year)
+        expected = sorted(Title.objects.values_list('id', flat=True))
+
+        settings.EXPORT_CHUNK_SIZE = 3
+        records = self.parse(admin_client.get(f'{self.url}?resources=titles'))
+        assert [record['data']['id'] for record in records] == expected, (
+            'Проверьте, что выгрузка проходит по таблице пачками по '
+            'первичному ключу без пропусков и повторов'
+        )
+
+        response = admin_client.get(f'{self.url}?resources=titles,users')
+        assert response.status_code == 400
+        response = admin_client.get(f'{self.url}?updated_since=вчера')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_updated_since(self, admin_client, admin):
+        from reviews.models import Genre, Review, Title
+        _, reviews, titles, user, _ = create_comments(admin_client, admin)
+        response = admin_client.get(self.url)
+        since = response['X-Export-Timestamp']
+        self.parse(response)
+
+        records = self.parse(
+            admin_client.get(self.url, {'updated_since': since})
+        )
+        assert records == [], (
+            'Проверьте, что `?updated_since=` отбрасывает неизменённые записи'
+        )
+
+        review = Review.objects.get(pk=reviews[0]['id'])
+        review.text = 'Изменённый отзыв'
+        review.save()
+        genre = Genre.objects.create(name='Мюзикл', slug='musical')
+        Title.objects.get(pk=titles[1]['id']).genre.add(genre)
+        records = self.parse(
+            admin_client.get(self.url, {'updated_since': since})
+        )
+        changed = {(record['type'], record['data']['id'])
+                   for record in records}
+        assert changed == {
+            ('title', titles[1]['id']),
+            ('review', review.pk),
+        }, (
+            'Проверьте, что в инкрементальную выгрузку попадают изменённые '
+            'записи и произведения с новым набором жанров'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/',
+            data={'score': 1}
+        )
+        records = self.parse(
+            admin_client.get(self.url, {'updated_since': since})
+        )
+        assert ('title', review.title_id) in {
+            (record['type'], record['data']['id']) for record in records
+        }, 'Проверьте, что смена оценки отмечает произведение изменённым'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_weighted_ratings_are_exported(self, admin_client, admin):
+        from django.core.management import call_command
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        # Взвешенный рейтинг зависит от априорного веса, только если
+        # средние оценки произведений различаются.
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+                          data={'text': 'Отзыв', 'score': 10})
+        call_command('recount_weighted_ratings')
+        response = admin_client.get(self.url)
+        since = response['X-Export-Timestamp']
+        self.parse(response)
+
+        call_command('recount_weighted_ratings')
+        records = self.parse(
+            admin_client.get(self.url, {'updated_since': since})
+        )
+        assert records == [], (
+            'Проверьте, что пересчёт без изменений не отмечает произведения '
+            'изменёнными'
+        )
+
+        call_command('recount_weighted_ratings', prior_reviews=3)
+        records = self.parse(admin_client.get(
+            self.url, {'updated_since': since, 'resources': 'titles'}
+        ))
+        assert {record['data']['id'] for record in records} == {
+            titles[0]['id'], titles[1]['id']
+        }, (
+            'Проверьте, что новый взвешенный рейтинг попадает в выгрузку '
+            '`?updated_since=`'
+        )
@@ -0,0 +1,169 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+
+class FlakyBackend(EmailBackend):
+    """
+    Не доставляет письма на адреса из `failing`, при `down` не открывает
+    соединение; считает соединения.
+    """
+    failing = set()
+    down = False
+    opened = 0
+
+    def open(self):
+        if self.down:
+            raise ConnectionRefusedError('SMTP недоступен')
+        type(self).opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.failing:
+                raise ConnectionError('SMTP недоступен')
+        return super().send_messages(messages)
+
+
+class Test25EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.fixture
+    def flaky_backend(self, settings):
+        settings.EMAIL_BACKEND = f'{__name__}.FlakyBackend'
+        FlakyBackend.opened = 0
+        FlakyBackend.failing = set()
+        FlakyBackend.down = False
+        return FlakyBackend
+
+    def send_emails(self, **options):
+        out = StringIO()
+        call_command('send_emails', stdout=out, **options)
+        return out.getvalue()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_queues_email(self, client, flaky_backend):
+        from users.models import OutgoingEmail
+        for number in range(3):
+            response = client.post(self.url_signup, data={
+                'email': f'user{number}@yamdb.fake',
+                'username': f'user{number}'
+            })
+            assert response.status_code == 200
+        assert mail.outbox == []
+        assert OutgoingEmail.objects.filter(sent_at__isnull=True).count() == 3, (
+            'Проверьте, что письмо с кодом подтверждения записывается в очередь'
+        )
+
+        output = self.send_emails()
+        assert 'Sent 3 emails, 0 failed' in output
+        assert 'emails/s' in output
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'user{number}@yamdb.fake' for number in range(3)
+        ]
+        assert flaky_backend.opened == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+
+        assert 'Sent 0 emails' in self.send_emails()
+        assert len(mail.outbox) == 3, (
+            'Проверьте, что отправленные письма не отправляются повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_emails_are_retried(self, flaky_backend, settings):
+        from django.utils import timezone
+
+        from users.models import OutgoingEmail
+        from users.outbox import queue_email
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+        flaky_backend.failing = {'down@yamdb.fake'}
+        queue_email('Тема', 'Текст', 'admin@yamdb.com',
+                    ['ok@yamdb.fake', 'down@yamdb.fake'])
+
+        output = self.send_emails(max_attempts=3)
+        assert 'Sent 1 emails, 1 failed' in output
+        assert [message.to for message in mail.outbox] == [['ok@yamdb.fake']]
+        email = OutgoingEmail.objects.get(to='down@yamdb.fake')
+        assert email.sent_at is None and email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.send_after > timezone.now(), (
+            'Проверьте, что неудачная отправка откладывается'
+        )
+        first_delay = email.send_after
+
+        assert 'Sent 0 emails, 0 failed' in self.send_emails(max_attempts=3), (
+            'Проверьте, что письмо не отправляется повторно раньше срока'
+        )
+
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        self.send_emails(max_attempts=3)
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert (email.send_after - timezone.now()
+                > first_delay - email.created_at), (
+            'Проверьте, что задержка перед повтором растёт'
+        )
+
+        flaky_backend.failing = set()
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        assert 'Sent 1 emails' in self.send_emails(max_attempts=3)
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.last_error == ''
+
+        queue_email('Тема', 'Текст', 'admin@yamdb.com', ['down@yamdb.fake'])
+        flaky_backend.failing = {'down@yamdb.fake'}
+        for _ in range(3):
+            OutgoingEmail.objects.update(send_after=timezone.now())
+            self.send_emails(max_attempts=2)
+        assert OutgoingEmail.objects.get(
+            to='down@yamdb.fake', sent_at__isnull=True
+        ).attempts == 2, (
+            'Проверьте, что после `max_attempts` попыток письмо больше '
+            'не отправляется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_connection_failure_postpones_batch(self, flaky_backend):
+        from django.utils import timezone
+
+        from users.models import OutgoingEmail
+        from users.outbox import queue_email
+        flaky_backend.down = True
+        queue_email('Тема', 'Текст', 'admin@yamdb.com',
+                    ['first@yamdb.fake', 'second@yamdb.fake'])
+        output = self.send_emails()
+        assert 'Sent 0 emails, 2 failed' in output, (
+            'Проверьте, что ошибка соединения с почтовым сервером не '
+            'прерывает `send_emails`'
+        )
+        for email in OutgoingEmail.objects.all():
+            assert email.attempts == 1 and email.sent_at is None
+            assert email.send_after > timezone.now()
+            assert 'SMTP' in email.last_error
+
+        flaky_backend.down = False
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        assert 'Sent 2 emails' in self.send_emails()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_claimed_emails_are_hidden(self, settings):
+        from django.utils import timezone
+
+        from users.models import OutgoingEmail
+        from users.outbox import claim_emails, queue_email
+        settings.EMAIL_OUTBOX_CLAIM_TIMEOUT = 600
+        queue_email('Тема', 'Текст', 'admin@yamdb.com',
+                    [f'user{number}@yamdb.fake' for number in range(3)])
+        claimed = claim_emails(batch_size=2, max_attempts=5)
+        assert len(claimed) == 2
+        assert [email.to for email in claim_emails(10, 5)] == [
+            'user2@yamdb.fake'
+        ], 'Проверьте, что взятые воркером письма не достаются другому'
+        assert claim_emails(10, 5) == []
+        assert all(email.send_after > timezone.now()
+                   for email in OutgoingEmail.objects.all())
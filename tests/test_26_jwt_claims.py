@@ -0,0 +1,128 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+USER_LOOKUP = 'FROM "users_user" WHERE "users_user"."id" ='
+
+
+class Test26JWTClaims:
+    url_users = '/api/v1/users/'
+
+    @pytest.fixture(autouse=True)
+    def shared_cache(self, settings, tmp_path):
+        settings.CACHES = {
+            **settings.CACHES,
+            'file': {**settings.CACHES['file'], 'LOCATION': str(tmp_path)},
+        }
+        settings.API_CACHE_ALIAS = 'file'
+
+    def issue_token(self, user):
+        from django.contrib.auth.tokens import default_token_generator
+        response = APIClient().post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user)
+        })
+        assert response.status_code == 200
+        return response.json()['token']
+
+    def client_for(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def user_lookups(self, client, url, method='get', **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, **kwargs)
+        lookups = [query['sql'] for query in context.captured_queries
+                   if USER_LOOKUP in query['sql']]
+        return response, lookups
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reads_skip_user_lookup(self, admin, admin_client):
+        from rest_framework_simplejwt.tokens import AccessToken
+        token = self.issue_token(admin)
+        claims = AccessToken(token)
+        assert (claims['username'], claims['role']) == ('TestAdmin', 'admin'), (
+            'Проверьте, что `/api/v1/auth/token/` добавляет роль в токен'
+        )
+
+        response, lookups = self.user_lookups(self.client_for(token),
+                                              self.url_users)
+        assert response.status_code == 200
+        assert lookups == [], (
+            'Проверьте, что для чтения пользователь берётся из токена '
+            'без запроса к БД'
+        )
+        response, lookups = self.user_lookups(admin_client, self.url_users)
+        assert response.status_code == 200
+        assert len(lookups) == 1, (
+            'Проверьте, что токены без утверждений проверяются по БД'
+        )
+
+        response = self.client_for(token).get(f'{self.url_users}me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == admin.email
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_writes_use_database_user(self, admin, admin_client):
+        from .common import create_titles
+        titles, _, _ = create_titles(admin_client)
+        client = self.client_for(self.issue_token(admin))
+        response, lookups = self.user_lookups(
+            client, f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            method='post', data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == admin.username
+        assert lookups, (
+            'Проверьте, что запросы на запись проверяют пользователя по БД'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_user_changes_invalidate_claims(self, admin_client, admin,
+                                               moderator):
+        moderator.role = 'admin'
+        moderator.save()
+        client = self.client_for(self.issue_token(moderator))
+        assert client.get(self.url_users).status_code == 200
+
+        response = admin_client.patch(f'{self.url_users}{moderator.username}/',
+                                      data={'role': 'user'})
+        assert response.status_code == 200
+        response, lookups = self.user_lookups(client, self.url_users)
+        assert response.status_code == 403, (
+            'Проверьте, что после смены роли старый токен не даёт прежних прав'
+        )
+        assert len(lookups) == 1
+
+        admin_client.delete(f'{self.url_users}{moderator.username}/')
+        assert client.get('/api/v1/titles/').status_code == 401, (
+            'Проверьте, что токен удалённого пользователя не принимается'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_cached_tokens_expire(self, admin):
+        from api.v1.authentication import ClaimsAccessToken
+        token = ClaimsAccessToken.for_user(admin)
+        token.set_exp(lifetime=timedelta(seconds=2))
+        client = self.client_for(str(token))
+        assert client.get(self.url_users).status_code == 200
+        time.sleep(2.1)
+        assert client.get(self.url_users).status_code == 401, (
+            'Проверьте, что истёкший токен не принимается из кэша'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_local_cache_uses_database(self, admin, settings):
+        settings.API_CACHE_ALIAS = 'default'
+        client = self.client_for(self.issue_token(admin))
+        response, lookups = self.user_lookups(client, self.url_users)
+        assert response.status_code == 200
+        assert len(lookups) == 1, (
+            'Проверьте, что с кэшем в памяти процесса пользователь читается '
+            'из БД: другой воркер не увидит сдвиг метки версии'
+        )
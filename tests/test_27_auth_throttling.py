@@ -0,0 +1,139 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+class Test27AuthThrottling:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+
+    @pytest.fixture
+    def rates(self, monkeypatch):
+        from rest_framework.throttling import SimpleRateThrottle
+
+        def set_rate(scope, rate):
+            monkeypatch.setitem(SimpleRateThrottle.THROTTLE_RATES, scope, rate)
+        return set_rate
+
+    def signup(self, number, ip='10.0.0.1', username=None):
+        return APIClient(REMOTE_ADDR=ip).post(self.url_signup, data={
+            'email': f'flood{number}@yamdb.fake',
+            'username': username or f'flood{number}'
+        })
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_limited_per_ip(self, rates,
+                                      django_assert_num_queries):
+        rates('signup', '2/min')
+        assert self.signup(1).status_code == 200
+        assert self.signup(2).status_code == 200
+        with django_assert_num_queries(0):
+            response = self.signup(3)
+        assert response.status_code == 429, (
+            'Проверьте, что `/api/v1/auth/signup/` ограничивает число '
+            'запросов с одного IP и отвечает 429 без запросов к БД'
+        )
+        assert 'Retry-After' in response
+        assert self.signup(3, ip='10.0.0.2').status_code == 200, (
+            'Проверьте, что лимит считается для каждого IP отдельно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_signup_limited_per_username(self, rates):
+        rates('signup_username', '2/min')
+        assert self.signup(1, ip='10.0.0.1').status_code == 200
+        # Повторная регистрация отклоняется, но тоже идёт в счёт лимита.
+        assert self.signup(1, ip='10.0.0.2').status_code == 400
+        assert self.signup(1, ip='10.0.0.3').status_code == 429, (
+            'Проверьте, что `/api/v1/auth/signup/` ограничивает число '
+            'запросов для одного username с разных адресов'
+        )
+        assert self.signup(2, ip='10.0.0.3').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_token_limited(self, rates, user, django_assert_num_queries):
+        from django.contrib.auth.tokens import default_token_generator
+        rates('token', '3/min')
+        rates('token_username', '2/min')
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for ip in ('10.0.0.1', '10.0.0.2'):
+            response = APIClient(REMOTE_ADDR=ip).post(self.url_token, data)
+            assert response.status_code == 400
+        data['confirmation_code'] = default_token_generator.make_token(user)
+        with django_assert_num_queries(0):
+            response = APIClient(REMOTE_ADDR='10.0.0.3').post(
+                self.url_token, data
+            )
+        assert response.status_code == 429, (
+            'Проверьте, что `/api/v1/auth/token/` ограничивает подбор кода '
+            'для одного username'
+        )
+
+        client = APIClient(REMOTE_ADDR='10.0.0.4')
+        for number in range(3):
+            response = client.post(self.url_token, {
+                'username': f'nobody{number}', 'confirmation_code': 'x'
+            })
+            assert response.status_code == 404
+        response = client.post(self.url_token, {
+            'username': 'nobody', 'confirmation_code': 'x'
+        })
+        assert response.status_code == 429, (
+            'Проверьте, что `/api/v1/auth/token/` ограничивает число '
+            'запросов с одного IP'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_forwarded_for_ignored(self, rates):
+        rates('signup', '1/min')
+        client = APIClient(REMOTE_ADDR='10.0.0.1')
+        for number in range(2):
+            response = client.post(self.url_signup, data={
+                'email': f'flood{number}@yamdb.fake',
+                'username': f'flood{number}'
+            }, HTTP_X_FORWARDED_FOR=f'192.168.0.{number}')
+        assert response.status_code == 429, (
+            'Проверьте, что без прокси лимит по IP нельзя обойти '
+            'заголовком `X-Forwarded-For`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_non_object_body(self):
+        for url in (self.url_signup, self.url_token):
+            response = APIClient().post(url, data=['username'],
+                                        format='json')
+            assert response.status_code == 400, (
+                f'Проверьте, что `{url}` отвечает 400 на тело-список'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_limits_ignore_credentials(self, rates, user, token_user,
+                                          django_assert_num_queries):
+        rates('signup', '1/min')
+        rates('token', '1/min')
+        rates('availability', '1/min')
+        client = APIClient(REMOTE_ADDR='10.0.0.1')
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}')
+        client.post(self.url_signup, data={
+            'email': 'flood1@yamdb.fake', 'username': 'flood1'
+        })
+        client.post(self.url_token, data={
+            'username': user.username, 'confirmation_code': 'wrong'
+        })
+        client.get('/api/v1/auth/availability/', {'username': 'flood2'})
+        requests = (
+            lambda: client.post(self.url_signup, data={
+                'email': 'flood2@yamdb.fake', 'username': 'flood2'
+            }),
+            lambda: client.post(self.url_token, data={
+                'username': user.username, 'confirmation_code': 'wrong'
+            }),
+            lambda: client.get('/api/v1/auth/availability/',
+                               {'username': 'flood3'}),
+        )
+        for request in requests:
+            with django_assert_num_queries(0):
+                response = request()
+            assert response.status_code == 429, (
+                'Проверьте, что запросы с заголовком `Authorization` к '
+                '`/api/v1/auth/` отклоняются лимитом без запросов к БД'
+            )
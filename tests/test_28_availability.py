@@ -0,0 +1,134 @@
+import pytest
+
+
+class Test28Availability:
+    url = '/api/v1/auth/availability/'
+
+    @pytest.fixture(autouse=True)
+    def fresh_index(self):
+        from api.v1.availability import availability_index
+        availability_index.reset()
+        yield availability_index
+        availability_index.reset()
+
+    def test_01_bloom_filter(self):
+        from api.v1.availability import BloomFilter
+        bloom = BloomFilter(1000, 0.01)
+        values = [f'user{number}' for number in range(1000)]
+        for value in values:
+            bloom.add(value)
+        assert all(value in bloom for value in values), (
+            'Проверьте, что у фильтра Блума нет ложноотрицательных ответов'
+        )
+        false_positives = sum(
+            f'other{number}' in bloom for number in range(10000)
+        )
+        assert false_positives < 300
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_free_values_skip_database(self, client, user,
+                                          django_assert_num_queries):
+        response = client.get(self.url, {'username': 'newcomer',
+                                         'email': 'new@yamdb.fake'})
+        assert response.status_code == 200
+        assert response.json() == {'username': True, 'email': True}
+        with django_assert_num_queries(0):
+            response = client.get(self.url, {'username': 'another',
+                                             'email': 'another@yamdb.fake'})
+        assert response.json() == {'username': True, 'email': True}, (
+            'Проверьте, что свободные значения проверяются фильтром Блума '
+            'без запросов к БД'
+        )
+
+        with django_assert_num_queries(2):
+            response = client.get(self.url, {'username': user.username,
+                                             'email': user.email})
+        assert response.json() == {'username': False, 'email': False}, (
+            'Проверьте, что занятые значения подтверждаются запросом к БД'
+        )
+        response = client.get(self.url, {'username': 'me'})
+        assert response.json() == {'username': False}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_new_users_are_added(self, client, fresh_index):
+        from api.v1.availability import IDENTITY_SCOPE
+        from api.v1.caching import bump_scopes, bump_version
+        from users.models import User
+        assert client.get(self.url, {'username': 'fresh'}).json() == {
+            'username': True
+        }
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'fresh', 'email': 'fresh@yamdb.fake'
+        })
+        assert response.status_code == 200
+        assert client.get(self.url, {'username': 'fresh'}).json() == {
+            'username': False
+        }, 'Проверьте, что фильтр пополняется при создании пользователя'
+
+        # Пользователь из другого процесса: сигналы здесь не сработали,
+        # но метка версии пользователей в общем кэше сдвинулась.
+        User.objects.bulk_create([
+            User(username='remote', email='remote@yamdb.fake')
+        ])
+        bump_version(User)
+        response = client.get(self.url, {'email': 'remote@yamdb.fake'})
+        assert response.json() == {'email': False}, (
+            'Проверьте, что фильтр догоняет пользователей, созданных '
+            'другими процессами'
+        )
+
+        # Переименование в другом процессе: его сигнал сдвигает метку
+        # IDENTITY_SCOPE.
+        User.objects.filter(username='remote').update(
+            username='renamed', email='renamed@yamdb.fake'
+        )
+        bump_scopes(User, [IDENTITY_SCOPE])
+        response = client.get(self.url, {'username': 'renamed',
+                                         'email': 'renamed@yamdb.fake'})
+        assert response.json() == {'username': False, 'email': False}, (
+            'Проверьте, что фильтр видит переименования пользователей '
+            'в других процессах'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_invalid_requests(self, client):
+        assert client.get(self.url).status_code == 400
+        assert client.get(self.url, {'email': 'not-an-email'}).status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_signup_does_not_rebuild(self, client, user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from users.models import User
+        assert client.get(self.url, {'username': 'early'}).json() == {
+            'username': True
+        }
+        for number in range(3):
+            response = client.post('/api/v1/auth/signup/', data={
+                'username': f'early{number}',
+                'email': f'early{number}@yamdb.fake'
+            })
+            assert response.status_code == 200
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(self.url,
+                                      {'username': f'early{number}'})
+            assert response.json() == {'username': False}
+            scans = [query['sql'] for query in context.captured_queries
+                     if 'COUNT' in query['sql']
+                     or 'WHERE' not in query['sql']]
+            assert scans == [], (
+                'Проверьте, что после регистрации фильтр дочитывает новых '
+                'пользователей, а не перестраивается по всей таблице'
+            )
+
+        renamed = User.objects.get(pk=user.pk)
+        renamed.username = 'renamed'
+        renamed.save()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.url, {'username': 'renamed'})
+        assert response.json() == {'username': False}
+        assert any('COUNT' in query['sql']
+                   for query in context.captured_queries), (
+            'Проверьте, что смена имени перестраивает фильтр'
+        )
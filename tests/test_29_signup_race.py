@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+from rest_framework.test import APIClient
+
+
+class Test29SignupRace:
+    url = '/api/v1/auth/signup/'
+    username_taken = 'Пользователь с таким именем уже зарегистрирован'
+    email_taken = 'Пользователь с таким email уже зарегистрирован'
+
+    def signup_concurrently(self, payloads, monkeypatch):
+        """
+        Регистрации в потоках, где каждая проходит валидацию раньше, чем
+        любая другая начнёт запись, — именно при таком порядке проверка
+        SELECT перед INSERT пропускала дубликаты.
+
+        Транзакции регистрации выполняются по очереди: так ведёт себя
+        блокировка записи в файловой SQLite и строк в PostgreSQL, а
+        тестовая SQLite в памяти с общим кэшем вместо ожидания сразу
+        отвечает ошибкой блокировки.
+        """
+        from contextlib import contextmanager
+
+        from django.db import connections, transaction
+
+        from api.v1.serializers import RegisterDataSerializer
+        barrier = threading.Barrier(len(payloads))
+        write_lock = threading.RLock()
+        atomic = transaction.atomic
+        validate = RegisterDataSerializer.validate
+        get_duplicate_errors = RegisterDataSerializer.get_duplicate_errors
+
+        def validate_together(serializer, data):
+            data = validate(serializer, data)
+            barrier.wait()
+            return data
+
+        @contextmanager
+        def atomic_in_turn(*args, **kwargs):
+            with write_lock, atomic(*args, **kwargs):
+                yield
+
+        def duplicate_errors_in_turn(serializer):
+            with write_lock:
+                return get_duplicate_errors(serializer)
+
+        monkeypatch.setattr(RegisterDataSerializer, 'validate',
+                            validate_together)
+        monkeypatch.setattr(RegisterDataSerializer, 'get_duplicate_errors',
+                            duplicate_errors_in_turn)
+        monkeypatch.setattr(transaction, 'atomic', atomic_in_turn)
+        responses = [None] * len(payloads)
+
+        def signup(number, data):
+            try:
+                responses[number] = APIClient().post(self.url, data=data)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=signup, args=item)
+                   for item in enumerate(payloads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_in_one_transaction(self, client,
+                                          django_assert_num_queries):
+        from users.models import OutgoingEmail
+        with django_assert_num_queries(3):
+            response = client.post(self.url, data={
+                'username': 'single', 'email': 'single@yamdb.fake'
+            })
+        assert response.status_code == 200, (
+            'Проверьте, что регистрация — одна транзакция с INSERT '
+            'пользователя и письма, без предварительных SELECT'
+        )
+        assert OutgoingEmail.objects.filter(to='single@yamdb.fake').exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_conflicts_keep_messages(self, client, user):
+        from users.models import OutgoingEmail, User
+        response = client.post(self.url, data={
+            'username': user.username, 'email': user.email
+        })
+        assert response.status_code == 400
+        assert response.json() == {
+            'username': [self.username_taken],
+            'email': [self.email_taken],
+        }
+        response = client.post(self.url, data={
+            'username': 'other', 'email': user.email
+        })
+        assert response.json() == {'email': [self.email_taken]}
+        assert not User.objects.filter(username='other').exists()
+        assert not OutgoingEmail.objects.exists(), (
+            'Проверьте, что при конфликте письмо не ставится в очередь'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_concurrent_signups(self, monkeypatch):
+        from rest_framework.throttling import SimpleRateThrottle
+
+        from users.models import OutgoingEmail, User
+        for scope in ('signup', 'signup_username'):
+            monkeypatch.setitem(SimpleRateThrottle.THROTTLE_RATES, scope,
+                                '1000/min')
+        payloads = [
+            {'username': 'racer', 'email': f'racer{number}@yamdb.fake'}
+            for number in range(4)
+        ] + [
+            {'username': f'racer{number}', 'email': 'shared@yamdb.fake'}
+            for number in range(4)
+        ]
+        responses = self.signup_concurrently(payloads, monkeypatch)
+        codes = [response.status_code for response in responses]
+        assert sorted(codes[:4]) == [200, 400, 400, 400], (
+            'Проверьте, что из одновременных регистраций с одним username '
+            'проходит ровно одна'
+        )
+        assert sorted(codes[4:]) == [200, 400, 400, 400], (
+            'Проверьте, что из одновременных регистраций с одним email '
+            'проходит ровно одна'
+        )
+        for response in responses:
+            if response.status_code == 400:
+                assert response.json() in (
+                    {'username': [self.username_taken]},
+                    {'email': [self.email_taken]},
+                )
+        assert User.objects.filter(username='racer').count() == 1
+        assert User.objects.filter(email='shared@yamdb.fake').count() == 1
+        assert OutgoingEmail.objects.count() == 2, (
+            'Проверьте, что письмо ставится в очередь только для созданных '
+            'пользователей'
+        )